@@ -21,8 +21,10 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
+import codecs
 from robot.libraries.BuiltIn import BuiltIn
 from Selenium2Library import Selenium2Library
+from Selenium2Library.utils import LibraryListener
 from ExtendedSelenium2Library.decorators import inherit_docs
 from ExtendedSelenium2Library.keywords import ExtendedElementKeywords
 from ExtendedSelenium2Library.keywords import ExtendedFormElementKeywords
@@ -61,31 +63,59 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
     | `Element Attribute Should Contain`                 |
     | `Element Attribute Should Not Contain`             |
     | `Execute Async Javascript With Replaced Variables` |
+    | `Execute Javascript Snippet`                       |
     | `Execute Javascript With Replaced Variables`       |
     | `Fast Wait Until Page Contains`                    |
+    | `Form Snapshot Should Match`                       |
     | `Get Browser Logs`                                 |
+    | `Get Form Snapshot`                                |
+    | `Get List Snapshot`                                |
     | `Get Screen Size`                                  |
     | `Is Element Visible`                               |
+    | `Log Locator Statistics`                           |
+    | `Register Javascript Snippet`                      |
     | `Register Page Ready Keyword`                      |
+    | `Remove Javascript Snippet`                        |
     | `Remove Page Ready Keyword`                        |
     | `Scroll Element Into View`                         |
+    | `Select Checkboxes`                                |
+    | `Select Radio Buttons`                             |
+    | `Unselect Checkboxes`                              |
     | `Wait For Async Condition`                         |
     | `Wait For Condition With Replaced Variables`       |
     | `Wait Until Angular Ready`                         |
     | `Wait Until Element Contains Attribute`            |
     | `Wait Until Element Does Not Contain Attribute`    |
+    | `Wait Until Elements Contain Attributes`           |
     | `Wait Until Location Contains`                     |
     | `Wait Until Location Does Not Contain`             |
     | `Warn Any Javascript Errors`                       |
 
     AngularJS Locators Support:
-    | *AngularJS Strategy* | *Example*                                         | *Description*                                        |
-    | model                | Click Element   `|` model=model_name              | Matches by AngularJS model name                      |
-    | binding              | Click Element   `|` binding=binding_name          | Matches by AngularJS binding name                    |
-    | partial binding      | Click Element   `|` partial binding=binding_name  | Matches by partial AngularJS binding name            |
-    | button               | Click Element   `|` button=My Button              | Matches button elements by their button text         |
-    | partial button       | Click Element   `|` partial button=y But          | Matches button elements by their partial button text |
-    | options              | Get WebElements `|` options=options_descriptor    | Matches by AngularJS options descriptor              |
+    | *AngularJS Strategy* | *Example*                                                          | *Description*                                                                          |
+    | model                | Click Element   `|` model=model_name                               | Matches by AngularJS model name                                                        |
+    | binding              | Click Element   `|` binding=binding_name                           | Matches by AngularJS binding name                                                      |
+    | partial binding      | Click Element   `|` partial binding=binding_name                   | Matches by partial AngularJS binding name                                              |
+    | button               | Click Element   `|` button=My Button                               | Matches button elements by their button text                                           |
+    | partial button       | Click Element   `|` partial button=y But                           | Matches button elements by their partial button text                                   |
+    | options              | Get WebElements `|` options=options_descriptor                     | Matches by AngularJS options descriptor                                                |
+    | repeater             | Click Element   `|` repeater=item in items |> 2 |> item.name       | Matches by partial AngularJS repeater, optionally by row index and column binding name |
+    | exact repeater       | Click Element   `|` exact repeater=item in items |> 2 |> item.name | Matches by exact AngularJS repeater, optionally by row index and column binding name   |
+
+    Extended Locators Support:
+    | *Strategy* | *Example*                                                         | *Description*                                                                             |
+    | frame      | Click Element `|` frame=id=outer |> css=iframe.inner |> model=name | Matches inside nested frames, the frame locators and the element locator separated by |> |
+    | shadow     | Click Element `|` shadow=my-app |> settings-panel |> button.save    | Matches CSS selector inside open shadow roots, optionally under the shadow hosts path     |
+
+    The browser stays inside the frame chain of a ``frame`` locator after the lookup, so that
+    the found element can be used by the keyword. The next lookup without a ``frame`` locator
+    switches back to the top frame, `Select Frame` and `Unselect Frame` work as usual.
+
+    Any locator can be scoped inside of container elements by prefixing it with the container
+    locators separated by ``>>``, e.g. ``css=form#user >> button=Save``. Absolute XPath lookups
+    are kept inside of the container. The ``dom``, ``frame``, ``jquery``, ``scLocator`` and
+    ``sizzle`` locators look up the whole page, so they are not supported inside of a container.
+    Locators are only split at ``>>`` followed by a locator strategy prefix.
 
     = Before running tests =
 
@@ -151,8 +181,20 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
                                       the page is ready. (Default True)
         - ``browser_breath_delay``: The delay value in seconds to give the browser enough time to
                                     complete current execution. (Default 0.05)
+        - ``browser_log_size``: The maximum number of browser log entries to be kept
+                                per browser. (Default 1000)
+        - ``capture_javascript_errors``: A boolean flag to capture JavaScript errors, console
+                                         errors and unhandled promise rejections in the page
+                                         as part of the page ready check, and add them to
+                                         the browser logs. By default, they are only captured
+                                         when the browser logs are not available, e.g. on
+                                         Internet Explorer. (Default None)
         - ``ensure_jq``: A boolean flag to ensure jQuery library is loaded on the page.
                          ``sizzle`` locator strategy will depend on this flag. (Default True)
+        - ``locator_statistics``: The file path where the locator statistics report, ranked by
+                                  the total lookup time of each locator, is written at the end
+                                  of the run. The locator statistics are only recorded when
+                                  it is given. See `Log Locator Statistics`. (Default None)
         - ``poll_frequency``: The delay value in seconds to retry the next step. (Default 0.2)
 
         Examples:
@@ -163,10 +205,14 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
         | Library `|` ExtendedSelenium2Library `|` timeout=10      `|` run_on_failure=Nothing    | # Sets default timeout to 10 seconds and does nothing on failure           |
         """
         # pylint: disable=line-too-long
+        capture_errors = kwargs.pop('capture_javascript_errors', None)
         self._inputs = {
             'block_until_page_ready': bool(kwargs.pop('block_until_page_ready', True)),
             'browser_breath_delay': float(kwargs.pop('browser_breath_delay', 0.05)),
+            'browser_log_size': int(kwargs.pop('browser_log_size', 1000)),
+            'capture_javascript_errors': None if capture_errors is None else bool(capture_errors),
             'ensure_jq': bool(kwargs.pop('ensure_jq', True)),
+            'locator_statistics': kwargs.pop('locator_statistics', None),
             'poll_frequency': float(kwargs.pop('poll_frequency', 0.2)),
         }
         self._builtin = BuiltIn()
@@ -177,12 +223,25 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
         ExtendedSelectElementKeywords.__init__(self)
         ExtendedWaitingKeywords.__init__(self)
         self._implicit_wait_in_secs = float(implicit_wait) if implicit_wait is not None else 15.0
+        self._page_ready_conditions = {}
         self._page_ready_keyword_list = []
         # pylint: disable=protected-access
         self._table_element_finder._element_finder = self._element_finder
+        if self._inputs['locator_statistics']:
+            self._element_finder.enable_statistics()
+            # pylint: disable=invalid-name
+            self.ROBOT_LIBRARY_LISTENER = _LibraryListener(self._write_locator_statistics)
 
     def get_browser_logs(self):
-        """Returns the Javascript console logs from the browser. (Non Internet Explorer only).
+        """Returns the Javascript console logs from the browser.
+
+        On browsers without browser logs, e.g. Internet Explorer, the JavaScript errors
+        captured in the page during the page ready checks are returned instead,
+        see ``capture_javascript_errors`` in `importing`.
+
+        The log entries are collected into a buffer of the current browser, which keeps
+        the last ``browser_log_size`` entries, see `importing`. All entries in the buffer are
+        returned, also the ones already reported by `Warn Any Javascript Errors`.
 
         Please see [https://goo.gl/S7yvqR|Logging Preferences JSON object] to set
         how verbose the logging should be. (Default 'SEVERE')
@@ -190,12 +249,12 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
         Examples:
         | Get Browser Logs |
         """
-        # IEDriverServer doesn't have log implementation yet
-        return [] if self._is_internet_explorer() else self._current_browser().get_log('browser')
+        return list(self._collect_browser_logs()['entries'])
 
     def get_location(self):
         # AngularJS support
         response = self._wait_until_page_ready(handler='function(){cb(location.href)}',
+                                               skip_stale_check=True,
                                                suffix='}else{cb(location.href)}',
                                                timeout=self._implicit_wait_in_secs)['response']
         # retry with sync approach
@@ -206,6 +265,39 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
             response = self._current_browser().get_current_url()
         return response
 
+    def get_window_identifiers(self):
+        """Returns and logs id attributes of all windows known to the browser.
+
+        Every window is selected to read its id, so the top frame of the current window
+        becomes the current frame.
+        """
+        try:
+            return super(ExtendedSelenium2Library, self).get_window_identifiers()
+        finally:
+            self._element_finder.set_frame_path(self._current_browser(), ())
+
+    def get_window_names(self):
+        """Returns and logs names of all windows known to the browser.
+
+        Every window is selected to read its name, so the top frame of the current window
+        becomes the current frame.
+        """
+        try:
+            return super(ExtendedSelenium2Library, self).get_window_names()
+        finally:
+            self._element_finder.set_frame_path(self._current_browser(), ())
+
+    def get_window_titles(self):
+        """Returns and logs titles of all windows known to the browser.
+
+        Every window is selected to read its title, so the top frame of the current window
+        becomes the current frame.
+        """
+        try:
+            return super(ExtendedSelenium2Library, self).get_window_titles()
+        finally:
+            self._element_finder.set_frame_path(self._current_browser(), ())
+
     # pylint: disable=arguments-differ
     # pylint: disable=too-many-arguments
     def open_browser(self, url, browser='firefox', alias=None, remote_url=False,
@@ -216,16 +308,32 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
             self._wait_until_page_ready()
         return index
 
-    def register_page_ready_keyword(self, keyword_name):
+    def register_page_ready_keyword(self, keyword_name, condition=None):
         """Adds a keyword to be run at the end of the wait until page ready keyword.
 
+        Registered keywords only run when the page has changed since the last page ready
+        check, and each of their timings is reported in the log. Any added or removed element
+        or changed attribute counts as a change, so a page which keeps updating itself,
+        e.g. with a ticking clock or a spinner, runs the keywords on every check.
+
         Arguments:
         - ``keyword_name``: Adds existing keyword name to be run when the page is ready.
+        - ``condition``: An optional JavaScript expression that is equivalent to ``keyword_name``.
+                         When given, it will be checked in the browser together with all other
+                         registered conditions as part of the page ready check, and
+                         ``keyword_name`` only runs when the condition is not met. An unmet
+                         condition is only checked once more after the poll frequency, the
+                         keyword itself waits for the page then. (Default None)
 
         Examples:
-        | Register Page Ready Keyword | My Keyword |
+        | Register Page Ready Keyword | My Keyword      |                                     |
+        | Register Page Ready Keyword | Spinner Is Gone | !document.querySelector('.spinner') |
         """
         self._page_ready_keyword_list.append(keyword_name)
+        if condition:
+            self._page_ready_conditions[keyword_name] = condition
+        # force the next page ready check to run all registered keywords
+        self._page_ready_state = None
 
     def remove_page_ready_keyword(self, keyword_name):
         """Removes a keyword to be run at the end of the wait until page ready keyword.
@@ -237,3 +345,92 @@ class ExtendedSelenium2Library(Selenium2Library, ExtendedElementKeywords,
         | Remove Page Ready Keyword | My Keyword |
         """
         self._page_ready_keyword_list.remove(keyword_name)
+        if keyword_name not in self._page_ready_keyword_list:
+            self._page_ready_conditions.pop(keyword_name, None)
+
+    def select_frame(self, locator):
+        """Sets frame identified by ``locator`` as current frame.
+
+        Arguments:
+        - ``locator``: The locator to find requested frame. Key attributes for frames are
+                       ``id`` and ``name``. See `introduction` for details about locating
+                       elements.
+
+        The selected frame stays the current frame for all lookups, until the next
+        ``frame`` locator or `Unselect Frame`.
+
+        Examples:
+        | Select Frame | id=my-frame |
+        """
+        super(ExtendedSelenium2Library, self).select_frame(locator)
+        # the frame chain is no longer known to the element finder
+        self._element_finder.set_frame_path(self._current_browser())
+
+    def select_window(self, locator=None):
+        """Selects the window matching locator and return previous window handle.
+
+        Arguments:
+        - ``locator``: Any of name, title, url, window handle, excluded handle's list,
+                       or the special words ``main``, ``self`` and ``new``, optionally with
+                       a ``title``, ``name`` or ``url`` strategy prefix.
+
+        The top frame of the selected window becomes the current frame.
+
+        Examples:
+        | Select Window | title=My Document |
+        """
+        try:
+            return super(ExtendedSelenium2Library, self).select_window(locator)
+        finally:
+            # every window switch, also the one back to the starting window, selects a top frame
+            if isinstance(locator, list) or (locator or '').lower() not in ('current', 'self'):
+                self._element_finder.set_frame_path(self._current_browser(), ())
+
+    def unselect_frame(self):
+        """Sets the top frame as the current frame, also after a ``frame`` locator lookup.
+
+        Examples:
+        | Unselect Frame |
+        """
+        super(ExtendedSelenium2Library, self).unselect_frame()
+        self._element_finder.set_frame_path(self._current_browser(), ())
+
+    def _frame_contains(self, locator, text):
+        """Searches the text inside the frame, the element finder stays inside the frame
+        until the top frame is selected again."""
+        browser = self._current_browser()
+        element = self._element_find(locator, True, True)
+        browser.switch_to_frame(element)
+        # the frame chain is no longer known to the element finder
+        self._element_finder.set_frame_path(browser)
+        self._info("Searching for text from frame '%s'." % locator)
+        try:
+            return self._is_text_present(text)
+        finally:
+            browser.switch_to_default_content()
+            self._element_finder.set_frame_path(browser, ())
+
+    def _set_document(self, browser, document_id):
+        """Tells the element finder about the document selected in the browser, a new html
+        element means a new document, which has none of the cached frames."""
+        self._element_finder.set_document(browser, document_id)
+
+    def _write_locator_statistics(self):
+        """Writes the ranked locator statistics report into the ``locator_statistics`` file."""
+        report = self._get_locator_statistics_report(self._element_finder.get_statistics())
+        with codecs.open(self._inputs['locator_statistics'], 'w', 'utf-8') as report_file:
+            report_file.write(report + '\n')
+
+
+# pylint: disable=too-few-public-methods
+class _LibraryListener(LibraryListener):
+    """Selenium2Library listener which also runs the given callback when the library
+    goes out of scope at the end of the run."""
+
+    def __init__(self, close_callback):
+        super(_LibraryListener, self).__init__()
+        self._close_callback = close_callback
+
+    def close(self):
+        """Runs the callback when the library goes out of scope."""
+        self._close_callback()
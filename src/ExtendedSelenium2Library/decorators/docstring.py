@@ -22,13 +22,18 @@ Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
 
+from inspect import isfunction
+
+
 def inherit_docs(cls):
     """Inherits method docstring from parent method."""
-    for name, func in list(vars(cls).items()):
-        if not func.__doc__:
-            for parent in cls.__bases__:
-                parent_func = getattr(parent, name, None)
-                if parent_func and getattr(parent_func, '__doc__', None):
-                    func.__doc__ = parent_func.__doc__
-                    break
+    for name, func in vars(cls).items():
+        # only undocumented methods, the rest of the class attributes are skipped
+        if not isfunction(func) or func.__doc__:
+            continue
+        for parent in cls.__mro__[1:]:
+            parent_func = vars(parent).get(name)
+            if parent_func is not None and getattr(parent_func, '__doc__', None):
+                func.__doc__ = parent_func.__doc__
+                break
     return cls
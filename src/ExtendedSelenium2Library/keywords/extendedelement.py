@@ -204,6 +204,26 @@ class ExtendedElementKeywords(_ElementKeywords):
         """
         return self._is_visible(locator)
 
+    def log_locator_statistics(self, limit=20):
+        """Logs the slowest locators ranked by their total lookup time, together with their
+        strategy, number of lookups, average and maximum lookup time, number of matches of
+        the last lookup and number of retries, which are lookups without any matches.
+        Returns the ranked locator statistics.
+
+        The locator statistics are only recorded when ``locator_statistics`` is given
+        in `importing`, where the full ranked report is written at the end of the run.
+
+        Arguments:
+        - ``limit``: The maximum number of locators to be logged. (Default 20)
+
+        Examples:
+        | Log Locator Statistics |    |
+        | Log Locator Statistics | 50 |
+        """
+        statistics = self._element_finder.get_statistics()
+        logger.info(self._get_locator_statistics_report(statistics[:int(limit)]))
+        return statistics
+
     def scroll_element_into_view(self, locator):
         """Scrolls an element from given ``locator`` into view.
 
@@ -225,11 +245,37 @@ class ExtendedElementKeywords(_ElementKeywords):
         self._current_browser().execute_script(script, element)
         return element
 
+    def _element_find(self, locator, first_only, required, tag=None):
+        """Returns the first element or all elements matching ``locator``, the element finder
+        stops at the first match when only the first element is needed."""
+        if isinstance(locator, WebElement):
+            return locator
+        # pylint: disable=no-member
+        elements = self._element_finder.find(self._current_browser(), locator, tag, first_only)
+        if required and not elements:
+            raise ValueError("Element locator '" + locator + "' did not match any elements.")
+        if first_only:
+            return elements[0] if elements else None
+        return elements
+
     def _get_browser_name(self):
         """Returns current browser name."""
         # pylint: disable=no-member
         return self._current_browser().capabilities['browserName'].strip().lower()
 
+    @staticmethod
+    def _get_locator_statistics_report(statistics):
+        """Returns the ranked locator statistics as a table."""
+        row = '%4s %10s %8s %10s %10s %8s %8s  %-16s %s'
+        lines = [row % ('Rank', 'Total (s)', 'Lookups', 'Avg (s)', 'Max (s)', 'Matches',
+                        'Retries', 'Strategy', 'Locator')]
+        for rank, item in enumerate(statistics, 1):
+            lines.append(row % (rank, '%.3f' % item['time'], item['lookups'],
+                                '%.3f' % (item['time'] / item['lookups']),
+                                '%.3f' % item['max_time'], item['matches'], item['retries'],
+                                item['strategy'], item['locator']))
+        return '\n'.join(lines)
+
     def _get_element_and_scroll_into_view_on_iexplore(self, locator, required=True, tag=None):
         """Scrolls a target element into view. (Internet Explorer only)."""
         element = self._element_find(locator, True, required, tag)
@@ -21,12 +21,50 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
+from selenium.webdriver.remote.webelement import WebElement
 from Selenium2Library.keywords import _FormElementKeywords
 
 
 class ExtendedFormElementKeywords(_FormElementKeywords):
     """ExtendedFormElementKeywords are form element execution in the requested browser."""
 
+    CHECK_INPUTS_SCRIPT = "var els=arguments[0],type=arguments[1],on=arguments[2]," \
+                          "l=[],r=[],i,j,c,el;for(i=0;i<els.length;i++){el=els[i];" \
+                          "if(el.tagName==='INPUT'){if(el.type===type){l.push(el)}continue}" \
+                          "c=el.querySelectorAll('input[type=\"'+type+'\"]');" \
+                          "for(j=0;j<c.length;j++){l.push(c[j])}}" \
+                          "for(i=0;i<l.length;i++){el=l[i];if(el.disabled||el.checked===on){" \
+                          "continue}if(window.angular){angular.element(el).prop('checked',on)." \
+                          "triggerHandler('click')}else{el.click()}r.push(el)}return r"
+    FORM_SNAPSHOT_SCRIPT = "var c=arguments[0].querySelectorAll('input,select,textarea')," \
+                           "p=['ng-model','data-ng-model','ng_model','x-ng-model','ng:model']," \
+                           "r={},g={},i,j,el,k,m,t,v,e;for(i=0;i<c.length;i++){el=c[i];" \
+                           "t=(el.type||el.tagName).toLowerCase();" \
+                           "if(/^(button|image|reset|submit)$/.test(t)){continue}m=null;" \
+                           "for(j=0;j<p.length&&!m;j++){m=el.getAttribute(p[j])}" \
+                           "k=el.name||el.id||m;if(!k){continue}" \
+                           "v=t==='checkbox'?el.checked:t==='radio'?(el.checked?el.value:null):" \
+                           "t==='select-multiple'?[]:el.value;if(t==='select-multiple'){" \
+                           "for(j=0;j<el.options.length;j++){if(el.options[j].selected){" \
+                           "v.push(el.options[j].value)}}}" \
+                           "e={type:t,value:v,model:m,disabled:!!el.disabled," \
+                           "valid:!(el.validity&&!el.validity.valid)&&" \
+                           "!/(^|\\s)ng-invalid(\\s|$)/.test(el.className)};" \
+                           "if(!r.hasOwnProperty(k)){r[k]=e;g[k]=[el];continue}g[k].push(el);" \
+                           "if(t==='radio'){if(el.checked){r[k].value=el.value}}" \
+                           "else if(t==='checkbox'){r[k].value=[];for(j=0;j<g[k].length;j++){" \
+                           "if(g[k][j].checked){r[k].value.push(g[k][j].value)}}}" \
+                           "r[k].valid=r[k].valid&&e.valid}return r"
+    SET_VALUE_SCRIPT = "var el=arguments[0],v=arguments[1];el.value=v;" \
+                       "function e(n){var x;if(document.createEvent){" \
+                       "x=document.createEvent('HTMLEvents');x.initEvent(n,true,true);" \
+                       "el.dispatchEvent(x)}else{el.fireEvent('on'+n)}}" \
+                       "e('input');e('change');if(window.angular){" \
+                       "var a=angular.element(el),c=a.controller('ngModel');" \
+                       "if(c&&c.$viewValue!==v){var i=a.injector(),r=i&&i.get('$rootScope')," \
+                       "f=function(){c.$setViewValue(v)};" \
+                       "if(r&&!r.$$phase){r.$apply(f)}else{f()}}}e('focusout');return true"
+
     def __init__(self):
         super(ExtendedFormElementKeywords, self).__init__()
 
@@ -56,6 +94,98 @@ class ExtendedFormElementKeywords(_FormElementKeywords):
             # pylint: disable=no-member
             self._wait_until_page_ready()
 
+    def form_snapshot_should_match(self, locator, expected, message=''):
+        """Verifies the form identified by ``locator`` matches the ``expected`` snapshot.
+
+        Only the fields in ``expected`` are verified. A field may be given its expected value,
+        or a dictionary of the expected snapshot attributes, see `Get Form Snapshot`.
+        All differences are reported together.
+
+        Arguments:
+        - ``locator``: The locator to find requested form. If ``locator`` is empty,
+                       first form in the page will be used. Key attributes for
+                       arbitrary forms are ``id``, and ``name``.
+                       See `introduction` for details about locating elements.
+        - ``expected``: A dictionary of field name and its expected value or attributes.
+        - ``message``: The value that would be use to override the default error message.
+
+        Examples:
+        | &{expected} =              | Create Dictionary | email=me@example.com | terms=${True} |
+        | Form Snapshot Should Match | css=form.class    | ${expected}          |               |
+        | &{invalid} =               | Create Dictionary | valid=${False}       |               |
+        | &{expected} =              | Create Dictionary | email=${invalid}     |               |
+        | Form Snapshot Should Match | css=form.class    | ${expected}          |               |
+        """
+        actual = self.get_form_snapshot(locator)
+        differences = []
+        for name in sorted(expected):
+            if name not in actual:
+                differences.append("Field '%s' does not exist." % name)
+                continue
+            attributes = expected[name] if isinstance(expected[name], dict) \
+                else {'value': expected[name]}
+            for attribute in sorted(attributes):
+                if actual[name].get(attribute) != attributes[attribute]:
+                    differences.append("Field '%s' %s should have been '%s' but it was '%s'." %
+                                       (name, attribute, attributes[attribute],
+                                        actual[name].get(attribute)))
+        if differences:
+            if not message:
+                message = "Form '%s' did not match the expected snapshot:\n%s" % \
+                          (locator or 'xpath=//form', '\n'.join(differences))
+            raise AssertionError(message)
+
+    def get_form_snapshot(self, locator=None):
+        """Returns all fields of the form identified by ``locator``, read in a single
+        browser call.
+
+        The returned dictionary is keyed by the field ``name``, ``id`` or AngularJS model name.
+        Each field is a dictionary of ``type``, ``value``, ``model``, ``disabled`` and ``valid``.
+        The value of a checkbox is its checked state, a radio button group has the value
+        of its checked radio button, a checkbox group and a multi-select list have a list
+        of their checked or selected values. Buttons are not included.
+
+        Arguments:
+        - ``locator``: The locator to find requested form or any container of fields.
+                       If ``locator`` is empty, first form in the page will be used.
+                       Key attributes for arbitrary forms are ``id``, and ``name``.
+                       See `introduction` for details about locating elements.
+
+        Examples:
+        | ${snapshot} =   | Get Form Snapshot             | css=form.class |
+        | Should Be Equal | ${snapshot['email']['value']} | me@example.com |
+        """
+        if not locator:
+            locator = 'xpath=//form'
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True)
+        # pylint: disable=no-member
+        return self._current_browser().execute_script(self.FORM_SNAPSHOT_SCRIPT, element)
+
+    # pylint: disable=arguments-differ
+    def input_text(self, locator, text, skip_ready=False, direct_set=False):
+        """Types the given ``text`` into text field identified by ``locator``.
+
+        Arguments:
+        - ``locator``: The locator to find requested text field. Key attributes for
+                       arbitrary text fields are ``id`` and ``name``.
+                       See `introduction` for details about locating elements.
+        - ``text``: The text to be typed into the text field.
+        - ``skip_ready``: A boolean flag to skip the wait for page ready. (Default False)
+        - ``direct_set``: A boolean flag to set the value directly in a single browser call,
+                          which dispatches the ``input`` and ``change`` events and updates
+                          the [https://goo.gl/Kzz8Y3|AngularJS] model, instead of typing
+                          the text one key at a time. (Default False)
+
+        Examples:
+        | Input Text | css=input.class    | text            |                    |
+        | Input Text | css=input.class    | text            | True               |
+        | Input Text | css=textarea.class | ${JSON_PAYLOAD} | direct_set=${True} |
+        """
+        # pylint: disable=no-member
+        self._info("Typing text '%s' into text field '%s'." % (text, locator))
+        self._input_text_into_text_field(locator, text, skip_ready, direct_set)
+
     def select_checkbox(self, locator):
         """Selects checkbox identified by ``locator``.
         Does nothing if checkbox is already selected.
@@ -72,7 +202,28 @@ class ExtendedFormElementKeywords(_FormElementKeywords):
         self._info("Selecting checkbox '%s'." % locator)
         element = self._get_checkbox(locator)
         if not element.is_selected():
-            self._select_checkbox_or_radio_button(locator)
+            self._select_checkbox_or_radio_button(element)
+
+    def select_checkboxes(self, *locators):
+        """Selects all checkboxes identified by ``*locators`` in a single browser call and
+        returns the checkboxes whose selection changed.
+        Does nothing to checkboxes that are already selected or disabled.
+
+        Arguments:
+        - ``*locators``: The locators to find requested checkboxes. Every element matched by
+                         a locator is used. When a matched element is not a checkbox, all
+                         checkboxes inside it are used, e.g. a container element.
+                         See `introduction` for details about locating elements.
+
+        Examples:
+        | Select Checkboxes | css=input.first | css=input.second |
+        | ${changed} =      | Select Checkboxes | css=table.permissions |
+        | Select Checkboxes | css=table.permissions input[name^="read"] |
+        """
+        # pylint: disable=no-member
+        self._info("Selecting checkboxes '%s'." %
+                   "', '".join('%s' % locator for locator in locators))
+        return self._check_inputs(locators, 'checkbox', True)
 
     def select_radio_button(self, group_name, value):
         """Sets selection of radio button group identified by ``group_name`` to ``value``.
@@ -93,8 +244,28 @@ class ExtendedFormElementKeywords(_FormElementKeywords):
         self._info("Selecting '%s' from radio button '%s'." % (value, group_name))
         element = self._get_radio_button_with_value(group_name, value)
         if not element.is_selected():
-            self._select_checkbox_or_radio_button('css=input[name="%s"][value="%s"]' %
-                                                  (group_name, value))
+            self._select_checkbox_or_radio_button(element)
+
+    def select_radio_buttons(self, *locators):
+        """Selects all radio buttons identified by ``*locators`` in a single browser call and
+        returns the radio buttons whose selection changed.
+        Does nothing to radio buttons that are already selected or disabled.
+
+        Arguments:
+        - ``*locators``: The locators to find requested radio buttons. Every element matched
+                         by a locator is used. When a matched element is not a radio button,
+                         all radio buttons inside it are used, so such locators should only
+                         contain one radio button per group.
+                         See `introduction` for details about locating elements.
+
+        Examples:
+        | Select Radio Buttons | css=input[value="XL"] | css=input[value="red"]        |
+        | ${changed} =         | Select Radio Buttons  | css=table.roles input.default |
+        """
+        # pylint: disable=no-member
+        self._info("Selecting radio buttons '%s'." %
+                   "', '".join('%s' % locator for locator in locators))
+        return self._check_inputs(locators, 'radio', True)
 
     # pylint: disable=arguments-differ
     def submit_form(self, locator=None, skip_ready=False):
@@ -121,21 +292,64 @@ class ExtendedFormElementKeywords(_FormElementKeywords):
             # pylint: disable=no-member
             self._wait_until_page_ready()
 
+    def unselect_checkboxes(self, *locators):
+        """Unselects all checkboxes identified by ``*locators`` in a single browser call and
+        returns the checkboxes whose selection changed.
+        Does nothing to checkboxes that are already unselected or disabled.
+
+        Arguments:
+        - ``*locators``: The locators to find requested checkboxes. Every element matched by
+                         a locator is used. When a matched element is not a checkbox, all
+                         checkboxes inside it are used, e.g. a container element.
+                         See `introduction` for details about locating elements.
+
+        Examples:
+        | Unselect Checkboxes | css=input.first   | css=input.second      |
+        | ${changed} =        | Unselect Checkboxes | css=table.permissions |
+        """
+        # pylint: disable=no-member
+        self._info("Unselecting checkboxes '%s'." %
+                   "', '".join('%s' % locator for locator in locators))
+        return self._check_inputs(locators, 'checkbox', False)
+
+    def _check_inputs(self, locators, input_type, checked):
+        """Sets the checked state of all checkboxes or radio buttons identified by ``locators``
+        with AngularJS support in one browser call, returns the changed elements."""
+        # pylint: disable=no-member
+        elements = []
+        for locator in locators:
+            if isinstance(locator, WebElement):
+                elements.append(locator)
+            else:
+                elements.extend(self._element_find(locator, False, True))
+        browser = self._current_browser()
+        changed = browser.execute_script(self.CHECK_INPUTS_SCRIPT, elements, input_type, checked)
+        if changed:
+            self._wait_until_page_ready(skip_stale_check=True)
+        return changed
+
     # pylint: disable=arguments-differ
-    def _input_text_into_text_field(self, locator, text, skip_ready=False):
+    def _input_text_into_text_field(self, locator, text, skip_ready=False, direct_set=False):
         """Send keys to text field with AngularJS synchronization."""
         # pylint: disable=no-member
         element = self._element_find(locator, True, True)
+        if direct_set:
+            # pylint: disable=no-member
+            self._current_browser().execute_script(self.SET_VALUE_SCRIPT, element, text)
+            if not skip_ready:
+                # pylint: disable=no-member
+                self._wait_until_page_ready(skip_stale_check=True)
+            return
         element.clear()
         element.send_keys(text)
         if not skip_ready:
             # pylint: disable=no-member
-            self._element_trigger_change(locator)
+            self._element_trigger_change(element)
 
-    def _select_checkbox_or_radio_button(self, locator):
+    def _select_checkbox_or_radio_button(self, element):
         """Select checkbox or radio button with AngularJS support."""
         # pylint: disable=no-member
-        self._wait_until_page_ready(locator,
+        self._wait_until_page_ready(element,
                                     skip_stale_check=True,
                                     prefix='var cb=arguments[arguments.length-1];'
                                            'var el=arguments[0];if(window.angular){',
@@ -21,14 +21,45 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
-from re import sub
+from collections import deque, OrderedDict
+from json import dumps
+from os import sep
+from os.path import getmtime, isabs, isfile
+from re import compile as re_compile, escape
+from sys import exc_info
+from zlib import crc32
+from robot import utils
+from selenium.common.exceptions import WebDriverException
 from Selenium2Library.keywords import _JavaScriptKeywords
 
 
 class ExtendedJavascriptKeywords(_JavaScriptKeywords):
     """ExtendedJavascriptKeywords are JavaScript related execution in the requested browser."""
+
+    EXCLUDES_CACHE_SIZE = 32
+    JAVASCRIPT_ARGUMENTS = '__es2lArgs'
+    JAVASCRIPT_CACHE_SIZE = 128
+    JAVASCRIPT_DECLARATIONS = ('class', 'const', 'function', 'let', 'var')
+    JAVASCRIPT_IDENTIFIER = re_compile(r'[A-Za-z_$][\w$]*')
+    JAVASCRIPT_NUMBER = re_compile(r'\d[\w.]*')
+    JAVASCRIPT_REGEX_KEYWORDS = ('case', 'delete', 'do', 'else', 'in', 'instanceof', 'new',
+                                 'return', 'throw', 'typeof', 'void', 'yield')
+    JAVASCRIPT_SPLICE = '\x00'
+    PYTHON_VALUES = {'False': 'false', 'None': 'null', 'True': 'true'}
+    SNIPPET_CALL_SCRIPT = "var ns=window.__es2l=window.__es2l||{},s=ns.snippets;" \
+                          "if(!s||s.revision!==arguments[0]){return {__es2lMissing:true}}" \
+                          "return s.fn[arguments[1]].apply(window,arguments[2])"
+    SNIPPET_DEFINITION_WRAPPER = "var ns=window.__es2l=window.__es2l||{};" \
+                                 "ns.snippets={revision:arguments[0],fn:{%(functions)s}};" \
+                                 "return ns.snippets.fn[arguments[1]].apply(window,arguments[2])"
+
     def __init__(self):
         super(ExtendedJavascriptKeywords, self).__init__()
+        self._browser_logs = {}
+        self._excludes_matchers = OrderedDict()
+        self._javascript_cache = OrderedDict()
+        self._javascript_snippets = OrderedDict()
+        self._javascript_snippets_definition = None
 
     def execute_async_javascript_with_replaced_variables(self, *code):
         # pylint: disable=line-too-long
@@ -67,12 +98,11 @@ class ExtendedJavascriptKeywords(_JavaScriptKeywords):
         | Should Be Equal          | ${retval}                                                              | text                              |
         """
         # pylint: disable=line-too-long
-        js_code = self._get_javascript_to_execute(''.join(code))
-        js_code = self._replace_variables_in_javascript_code(js_code)
+        js_code, arguments = self._get_compiled_javascript(''.join(code))
         # pylint: disable=no-member
         self._debug('Executing Asynchronous JavaScript:\n%s' % js_code)
         # pylint: disable=no-member
-        return self._current_browser().execute_async_script(js_code)
+        return self._current_browser().execute_async_script(js_code, *arguments)
 
     def execute_javascript_with_replaced_variables(self, *code):
         # pylint: disable=line-too-long
@@ -104,12 +134,47 @@ class ExtendedJavascriptKeywords(_JavaScriptKeywords):
         | Should Be Equal                            | ${sum}                                     | ${2}          |
         """
         # pylint: disable=line-too-long
-        js_code = self._get_javascript_to_execute(''.join(code))
-        js_code = self._replace_variables_in_javascript_code(js_code)
+        js_code, arguments = self._get_compiled_javascript(''.join(code))
         # pylint: disable=no-member
         self._debug('Executing JavaScript:\n%s' % js_code)
         # pylint: disable=no-member
-        return self._current_browser().execute_script(js_code)
+        return self._current_browser().execute_script(js_code, *arguments)
+
+    def execute_javascript_snippet(self, name, *arguments):
+        """Executes the JavaScript snippet registered as ``name`` with the given ``*arguments``
+        and returns its return value.
+
+        Registered snippets are defined as functions in each new document the first time
+        any of them is executed there, so every subsequent execution only sends the snippet
+        name and its arguments to the browser.
+
+        Arguments:
+        - ``name``: The name of a snippet registered with `Register JavaScript Snippet`.
+        - ``*arguments``: The arguments to call the snippet with, they are accessible through
+                          the ``arguments`` object in the snippet.
+
+        Examples:
+        | ${value} = | Execute JavaScript Snippet | read cell | 3 | 4 |
+        """
+        if name not in self._javascript_snippets:
+            raise ValueError("JavaScript snippet '%s' is not registered." % name)
+        if self._javascript_snippets_definition is None:
+            functions = ','.join('%s:function(){%s\n}' % (dumps(snippet), code)
+                                 for snippet, code in self._javascript_snippets.items())
+            self._javascript_snippets_definition = (
+                '%08x' % (crc32(functions.encode('utf-8')) & 0xffffffff),
+                self.SNIPPET_DEFINITION_WRAPPER % {'functions': functions})
+        revision, definition = self._javascript_snippets_definition
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        response = browser.execute_script(self.SNIPPET_CALL_SCRIPT, revision, name,
+                                          list(arguments))
+        if isinstance(response, dict) and response.get('__es2lMissing'):
+            # pylint: disable=no-member
+            self._debug('Defining JavaScript snippets %s in the page.' %
+                        list(self._javascript_snippets))
+            response = browser.execute_script(definition, revision, name, list(arguments))
+        return response
 
     def get_screen_size(self):
         """Returns current screen size as `width` and `height`.
@@ -120,9 +185,45 @@ class ExtendedJavascriptKeywords(_JavaScriptKeywords):
         # pylint: disable=no-member
         return self._current_browser().execute_script('return [screen.width, screen.height]')
 
+    def register_javascript_snippet(self, name, *code):
+        # pylint: disable=line-too-long
+        """Registers the given JavaScript ``code`` as a snippet named ``name`` to be executed
+        with `Execute JavaScript Snippet`. Registering an existing ``name`` replaces it.
+
+        Arguments:
+        - ``name``: The snippet name.
+        - ``*code``: The body of the snippet function, it may be divided into multiple cells
+                     in the test data. In that case, the parts are catenated together without
+                     adding spaces. If ``code`` is an absolute path to an existing file,
+                     the snippet will be read from that file.
+
+        Examples:
+        | Register JavaScript Snippet | read cell   | var r=document.querySelectorAll('tr')[arguments[0]]; | return r.cells[arguments[1]].textContent |
+        | Register JavaScript Snippet | clear store | ${CURDIR}/clear_local_storage.js                     |                                          |
+        """
+        # pylint: disable=line-too-long
+        # pylint: disable=no-member
+        self._javascript_snippets[name] = self._get_javascript_to_execute(''.join(code))
+        self._javascript_snippets_definition = None
+
+    def remove_javascript_snippet(self, name):
+        """Removes the JavaScript snippet registered as ``name``.
+
+        Arguments:
+        - ``name``: The snippet name.
+
+        Examples:
+        | Remove JavaScript Snippet | read cell |
+        """
+        del self._javascript_snippets[name]
+        self._javascript_snippets_definition = None
+
     def warn_any_javascript_errors(self, excludes=None, label=''):
         """Log any JavaScript errors in the page as warning in the test report.
 
+        Only the log entries since the previous call are reported, `Get Browser Logs` returns
+        all of them.
+
         Arguments:
         - ``excludes``: An exclusion list to be use to filter out error messages. (Default None)
         - ``label``: Label the JavaScript errors for easy reading. (Default '')
@@ -133,25 +234,330 @@ class ExtendedJavascriptKeywords(_JavaScriptKeywords):
         | Warn Any Javascript Errors | ${None}      | MY_LABEL     |
         | Warn Any Javascript Errors | ${excludes}  | ${TEST NAME} |
         """
-        excludes = excludes if excludes is not None else ()
-
-        def include(value):
-            """Filter out error messages based on exclusion list."""
-            return not any(True for e in excludes if e in value)
-        # pylint: disable=no-member
-        logs = self.get_browser_logs()
+        logs = self._read_browser_logs('warned')
+        matcher = self._get_excludes_matcher(excludes)
         # opt-out approach
-        logs = [error for error in logs if include(error['message'])]
+        if matcher:
+            logs = [error for error in logs if not matcher.search(error['message'])]
         total_logs = len(logs)
         if total_logs > 0:
             message = '%s %s' % (label, logs)
             # pylint: disable=no-member
             self._warn(message)
 
-    def _replace_variables_in_javascript_code(self, code):
-        """Replace all variables in the given JavaScript ``code``
-        for later JavaScript execution."""
+    def _collect_browser_logs(self):
+        """Drains the new browser log entries of the current browser into its bounded log
+        buffer, and returns the buffer with the total number of entries collected so far."""
+        collector = self._get_browser_log_collector()
+        # IEDriverServer doesn't have log implementation yet
+        # pylint: disable=no-member
+        if collector['supported'] and not self._is_internet_explorer():
+            try:
+                # pylint: disable=no-member
+                self._store_browser_logs(self._current_browser().get_log('browser'))
+            except WebDriverException:
+                # pylint: disable=no-member
+                self._debug(exc_info()[0])
+                collector['supported'] = False
+        return collector
+
+    def _compile_javascript(self, code):
+        """Compiles the given JavaScript ``code`` into a template of literal code pieces,
+        variables to be spliced between them and variables to be passed as script arguments.
+        Every spliced variable is recorded with whether it is spliced into code or inside
+        a string, template, regular expression or comment literal."""
+        segments, names = self._split_javascript_variables(code)
+        # pylint: disable=no-member
+        literals = [self._builtin.replace_variables(segment) for segment in segments]
+        source = self.JAVASCRIPT_SPLICE.join(literals)
+        if source.count(self.JAVASCRIPT_SPLICE) != len(names):
+            # the code contains the splice character itself, splice every variable as code
+            return ([self._replace_python_values_in_javascript_code(literal)
+                     for literal in literals], [(name, True) for name in names], [])
+        # the variable names, with the spliced variables and the script arguments found so far
+        variables = (names, [], [])
+        output, flushed = [], 0
+        for token in self._tokenize_javascript(source):
+            replacement = self._compile_javascript_token(source, token, variables)
+            if replacement is not None:
+                output.extend((source[flushed:token[1]], replacement))
+                flushed = token[2]
+        output.append(source[flushed:])
+        pieces = ''.join(output).split(self.JAVASCRIPT_SPLICE)
+        if variables[2]:
+            pieces[0] = 'var %s=arguments;%s' % (self.JAVASCRIPT_ARGUMENTS, pieces[0])
+        return pieces, variables[1], variables[2]
+
+    def _compile_javascript_token(self, code, token, variables):
+        """Returns the replacement of the given JavaScript ``token``, which is the argument
+        of a whole string literal variable, e.g. '${name}', or the JavaScript value of
+        a Python value, and records in ``variables``, the variable names with the spliced
+        variables and script arguments found so far, where the variables inside the token
+        are spliced."""
+        names, splices, arguments = variables
+        kind, start, end = token[:3]
+        position = len(splices) + len(arguments)
+        if kind == 'string' and code[start + 1:end] == self.JAVASCRIPT_SPLICE + code[start] \
+                and names[position][0] in '$%':
+            arguments.append(names[position])
+            return '%s[%d]' % (self.JAVASCRIPT_ARGUMENTS, len(arguments) - 1)
+        count = code.count(self.JAVASCRIPT_SPLICE, start, end)
+        splices.extend((name, kind == 'splice') for name in names[position:position + count])
+        return self._get_javascript_value(code, token)
+
+    @staticmethod
+    def _find_closing(code, index, opening, closing):
+        """Returns the position of the ``closing`` character that matches
+        the ``opening`` character at ``index``, or -1 when there is none."""
+        depth = 0
+        for position in range(index, len(code)):
+            if code[position] == opening:
+                depth += 1
+            elif code[position] == closing:
+                depth -= 1
+                if not depth:
+                    return position
+        return -1
+
+    def _get_compiled_javascript(self, code):
+        """Returns the JavaScript ``code`` with replaced variables and its script arguments,
+        the ``code`` is only compiled once per source (and file modification time)."""
+        codepath = code.replace('/', sep)
+        key = (code, getmtime(codepath) if isabs(codepath) and isfile(codepath) else None)
+        template = self._javascript_cache.pop(key, None)
+        if template is None:
+            # pylint: disable=no-member
+            template = self._compile_javascript(self._get_javascript_to_execute(code))
+        self._javascript_cache[key] = template
+        while len(self._javascript_cache) > self.JAVASCRIPT_CACHE_SIZE:
+            self._javascript_cache.popitem(False)
+        pieces, splices, arguments = template
+        js_code = [pieces[0]]
+        for (name, in_code), piece in zip(splices, pieces[1:]):
+            # pylint: disable=no-member
+            value = utils.unic(self._builtin.replace_variables(name))
+            if in_code:
+                value = self._replace_python_values_in_javascript_code(value)
+            js_code.extend((value, piece))
         # pylint: disable=no-member
-        code = self._builtin.replace_variables(code)
-        code = sub(r'(False|True)', lambda match: match.group(1).lower(), code)
-        return code
+        return ''.join(js_code), [utils.unic(self._builtin.replace_variables(name))
+                                  for name in arguments]
+
+    def _get_browser_log_collector(self):
+        """Returns the browser log collector of the current browser."""
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        collector = self._browser_logs.get(browser.session_id)
+        if collector is None:
+            # pylint: disable=no-member
+            collector = {'entries': deque(maxlen=self._inputs['browser_log_size']),
+                         'supported': True, 'total': 0, 'warned': 0}
+            self._browser_logs[browser.session_id] = collector
+        return collector
+
+    def _get_excludes_matcher(self, excludes):
+        """Returns a compiled regular expression that matches any of the given ``excludes``."""
+        if not excludes:
+            return None
+        key = tuple(excludes)
+        matcher = self._excludes_matchers.pop(key, None)
+        if matcher is None:
+            matcher = re_compile('|'.join(escape(exclude) for exclude in key))
+        self._excludes_matchers[key] = matcher
+        while len(self._excludes_matchers) > self.EXCLUDES_CACHE_SIZE:
+            self._excludes_matchers.popitem(False)
+        return matcher
+
+    @staticmethod
+    def _get_javascript_token_marker(code, token):
+        """Returns the text of a word or punctuator ``token``, and a marker of any other kind
+        of JavaScript token, to tell what may follow it."""
+        kind, start, end = token[:3]
+        if kind in ('punct', 'word'):
+            return code[start:end]
+        if kind == 'string':
+            return code[start]
+        if kind == 'template':
+            return '${' if code.endswith('${', start, end) else '`'
+        return '0'
+
+    def _get_javascript_value(self, code, token):
+        """Returns the JavaScript value of a standalone Python value ``token``, or None
+        when it is not a Python value, or a property name, object key or declared name."""
+        kind, start, end, previous = token
+        if kind != 'word' or previous == '.' or previous in self.JAVASCRIPT_DECLARATIONS:
+            return None
+        if previous in ('{', ',') and code[end:].lstrip()[:1] == ':':
+            return None
+        return self.PYTHON_VALUES.get(code[start:end])
+
+    def _is_javascript_regex_position(self, previous):
+        """Returns true if a slash after the ``previous`` token starts a regular expression
+        literal instead of a division."""
+        if not previous or previous in self.JAVASCRIPT_REGEX_KEYWORDS:
+            return True
+        return not self.JAVASCRIPT_IDENTIFIER.match(previous) and previous not in ')]}\'"`0'
+
+    def _read_browser_logs(self, cursor):
+        """Returns the browser log entries of the current browser collected since the last
+        read with the same ``cursor``, as far as the log buffer still holds them."""
+        collector = self._collect_browser_logs()
+        entries = collector['entries']
+        logs = list(entries)[max(len(entries) - (collector['total'] - collector[cursor]), 0):]
+        collector[cursor] = collector['total']
+        return logs
+
+    def _replace_python_values_in_javascript_code(self, code):
+        """Replace Python ``True``, ``False`` and ``None`` representations in the given
+        JavaScript ``code`` with their JavaScript values in a single pass. Only standalone
+        values are replaced, not strings, comments, regular expressions, property names,
+        object keys, declared names or other identifiers containing them."""
+        if code in self.PYTHON_VALUES:
+            return self.PYTHON_VALUES[code]
+        output, flushed = [], 0
+        for token in self._tokenize_javascript(code):
+            value = self._get_javascript_value(code, token)
+            if value is not None:
+                output.extend((code[flushed:token[1]], value))
+                flushed = token[2]
+        output.append(code[flushed:])
+        return ''.join(output)
+
+    def _scan_javascript_token(self, code, index, previous, templates):
+        """Returns the kind and the end position of the JavaScript token at ``index``."""
+        char = code[index]
+        word = self.JAVASCRIPT_IDENTIFIER.match(code, index)
+        if char in '\'"':
+            token = 'string', self._skip_javascript_string(code, index + 1, char)
+        elif char == '`' or (char == '}' and templates and not templates[-1]):
+            token = 'template', self._skip_javascript_template(code, index, templates)
+        elif code.startswith('//', index) or code.startswith('/*', index):
+            token = 'comment', self._skip_javascript_comment(code, index)
+        elif char == '/' and self._is_javascript_regex_position(previous):
+            token = 'regex', self._skip_javascript_regex(code, index + 1)
+        elif char == self.JAVASCRIPT_SPLICE:
+            token = 'splice', index + 1
+        elif word:
+            token = 'word', word.end()
+        elif char.isdigit():
+            token = 'number', self.JAVASCRIPT_NUMBER.match(code, index).end()
+        else:
+            if templates and char in '{}':
+                templates[-1] += 1 if char == '{' else -1
+            token = 'punct', index + 1
+        return token
+
+    @staticmethod
+    def _skip_javascript_comment(code, index):
+        """Returns the position after the JavaScript comment, which starts at ``index``."""
+        if code.startswith('//', index):
+            end = code.find('\n', index)
+            return len(code) if end < 0 else end
+        end = code.find('*/', index + 2)
+        return len(code) if end < 0 else end + 2
+
+    @staticmethod
+    def _skip_javascript_regex(code, index):
+        """Returns the position after the JavaScript regular expression literal
+        and its flags, which body starts at ``index``."""
+        in_class = False
+        length = len(code)
+        while index < length and code[index] not in '\r\n':
+            char = code[index]
+            if char == '\\':
+                index += 1
+            elif char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                index += 1
+                break
+            index += 1
+        while index < length and (code[index].isalnum() or code[index] in '_$'):
+            index += 1
+        return index
+
+    @staticmethod
+    def _skip_javascript_string(code, index, quote):
+        """Returns the position after the JavaScript string literal,
+        which content starts at ``index``."""
+        length = len(code)
+        while index < length:
+            if code[index] == '\\':
+                index += 1
+            elif code[index] == quote:
+                return index + 1
+            index += 1
+        return length
+
+    @staticmethod
+    def _skip_javascript_template(code, index, templates):
+        """Returns the position after the JavaScript template literal part at ``index``,
+        which starts or ends the template literal or an embedded expression, and keeps
+        track of the embedded expressions in ``templates``."""
+        if code[index] == '}':
+            templates.pop()
+        index += 1
+        length = len(code)
+        while index < length:
+            if code[index] == '\\':
+                index += 1
+            elif code[index] == '`':
+                return index + 1
+            elif code.startswith('${', index):
+                templates.append(0)
+                return index + 2
+            index += 1
+        return length
+
+    def _store_browser_logs(self, logs):
+        """Stores the given browser ``logs`` into the log buffer of the current browser."""
+        collector = self._get_browser_log_collector()
+        collector['entries'].extend(logs)
+        collector['total'] += len(logs)
+
+    @staticmethod
+    def _split_javascript_variables(code):
+        """Splits the given JavaScript ``code`` into literal segments and
+        the variables between them, escaped variables stay in the literal segments."""
+        segments, names = [], []
+        start = index = 0
+        length = len(code)
+        while index < length - 1:
+            if code[index] not in '$@&%' or code[index + 1] != '{':
+                index += 1
+                continue
+            backslashes = len(code[start:index]) - len(code[start:index].rstrip('\\'))
+            end = ExtendedJavascriptKeywords._find_closing(code, index + 1, '{', '}')
+            if backslashes % 2 or end < 0:
+                index += 2
+                continue
+            # item access, e.g. ${list}[0], belongs to the variable
+            while end + 1 < length and code[end + 1] == '[':
+                item_end = ExtendedJavascriptKeywords._find_closing(code, end + 1, '[', ']')
+                if item_end < 0:
+                    break
+                end = item_end
+            segments.append(code[start:index])
+            names.append(code[index:end + 1])
+            start = index = end + 1
+        segments.append(code[start:])
+        return segments, names
+
+    def _tokenize_javascript(self, code):
+        """Yields the kind, start and end position of every JavaScript token in ``code``,
+        together with the marker of the previous token, skipping whitespace."""
+        index, length, previous = 0, len(code), ''
+        # brace depths of the template literal expressions being tokenized
+        templates = []
+        while index < length:
+            if code[index].isspace():
+                index += 1
+                continue
+            token = self._scan_javascript_token(code, index, previous, templates)
+            token = (token[0], index, token[1], previous)
+            yield token
+            if token[0] != 'comment':
+                previous = self._get_javascript_token_marker(code, token)
+            index = token[2]
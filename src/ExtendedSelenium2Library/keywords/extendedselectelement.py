@@ -21,15 +21,108 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
+from selenium.common.exceptions import NoSuchElementException
 from Selenium2Library.keywords import _SelectElementKeywords
 
 
 class ExtendedSelectElementKeywords(_SelectElementKeywords):
     """ExtendedSelectElementKeywords are select element execution in the requested browser."""
 
+    LIST_SNAPSHOT_SCRIPT = "var o=arguments[0].options,f=arguments[1],n=arguments[2]," \
+                           "r={labels:[],values:[],selected:[]},i,t;" \
+                           "for(i=0;i<o.length;i++){t=(o[i].textContent||o[i].innerText||'')." \
+                           "replace(/\\s+/g,' ').replace(/^\\s|\\s$/g,'');" \
+                           "if((n&&!o[i].selected)||(f&&t.indexOf(f)<0)){continue}" \
+                           "r.labels.push(t);r.values.push(o[i].value);" \
+                           "r.selected.push(!!o[i].selected)}return r"
+    SELECT_ITEM_NAMES = {'index': 'index(es)', 'item': 'option(s)', 'label': 'label(s)',
+                         'value': 'value(s)'}
+    SELECT_OPTIONS_SCRIPT = "var el=arguments[0],by=arguments[1],items=arguments[2]," \
+                            "o=el.options,m=[],i;if(!el.multiple){return null}" \
+                            "function t(x){return (x.textContent||x.innerText||'')." \
+                            "replace(/\\s+/g,' ').replace(/^\\s|\\s$/g,'')}" \
+                            "function s(b,v){var f=false;for(var k=0;k<o.length;k++){" \
+                            "if(b==='index'?k===v:b==='value'?o[k].value===v:t(o[k])===v){" \
+                            "o[k].selected=true;f=true}}return f}" \
+                            "function e(n){var v;if(document.createEvent){" \
+                            "v=document.createEvent('HTMLEvents');v.initEvent(n,true,true);" \
+                            "el.dispatchEvent(v)}else{el.fireEvent('on'+n)}}" \
+                            "if(!items.length){for(i=0;i<o.length;i++){o[i].selected=true}}" \
+                            "for(i=0;i<items.length;i++){if(!(by==='item'?" \
+                            "s('value',items[i])||s('label',items[i]):s(by,items[i]))){" \
+                            "m.push(items[i])}}e('change');e('focusout');return m"
+
     def __init__(self):
         super(ExtendedSelectElementKeywords, self).__init__()
 
+    def get_list_items(self, locator):
+        """Returns the labels of all options in the select list identified by ``locator``.
+
+        Arguments:
+        - ``locator``: The locator to find requested select list. Key attributes for
+                       select lists are ``id`` and ``name``. See `introduction` for
+                       details about locating elements.
+
+        Examples:
+        | ${labels} = | Get List Items | css=select.class |
+        """
+        return self.get_list_snapshot(locator)['labels']
+
+    def get_list_snapshot(self, locator, label_filter=None, selected_only=False):
+        """Returns the labels, values and selected flags of the options in the select list
+        identified by ``locator``, read in a single browser call.
+
+        The returned dictionary has ``labels``, ``values`` and ``selected`` keys, each of them
+        is a list ordered by the option position in the select list.
+
+        Arguments:
+        - ``locator``: The locator to find requested select list. Key attributes for
+                       select lists are ``id`` and ``name``. See `introduction` for
+                       details about locating elements.
+        - ``label_filter``: Only returns options which label contains this value. (Default None)
+        - ``selected_only``: A boolean flag to only return selected options. (Default False)
+
+        Examples:
+        | ${snapshot} =   | Get List Snapshot     | css=select.class |
+        | ${snapshot} =   | Get List Snapshot     | css=select.class | label_filter=New |
+        | ${snapshot} =   | Get List Snapshot     | css=select.class | selected_only=${True} |
+        | Should Contain  | ${snapshot['labels']} | New York         |
+        """
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        return browser.execute_script(self.LIST_SNAPSHOT_SCRIPT, element, label_filter,
+                                      bool(selected_only))
+
+    def get_selected_list_labels(self, locator):
+        """Returns the labels of selected options from the select list identified by ``locator``.
+        Fails if there is no selection.
+
+        Arguments:
+        - ``locator``: The locator to find requested select list. Key attributes for
+                       select lists are ``id`` and ``name``. See `introduction` for
+                       details about locating elements.
+
+        Examples:
+        | ${labels} = | Get Selected List Labels | css=select.class |
+        """
+        return self._get_selected_list_snapshot(locator)['labels']
+
+    def get_selected_list_values(self, locator):
+        """Returns the values of selected options from the select list identified by ``locator``.
+        Fails if there is no selection.
+
+        Arguments:
+        - ``locator``: The locator to find requested select list. Key attributes for
+                       select lists are ``id`` and ``name``. See `introduction` for
+                       details about locating elements.
+
+        Examples:
+        | ${values} = | Get Selected List Values | css=select.class |
+        """
+        return self._get_selected_list_snapshot(locator)['values']
+
     def select_all_from_list(self, locator):
         """Selects all values from multi-select list identified by ``locator``.
 
@@ -41,8 +134,11 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         Examples:
         | Select All From List | css=select.class |
         """
-        super(ExtendedSelectElementKeywords, self).select_all_from_list(locator)
-        self._element_trigger_change(locator)
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        if not self._select_options_in_browser(locator, element, 'item', []):
+            super(ExtendedSelectElementKeywords, self).select_all_from_list(locator)
+            self._element_trigger_change(element)
 
     def select_from_list(self, locator, *items):
         """Selects ``*items`` from list identified by ``locator``
@@ -51,7 +147,8 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         value will be selected. If the target list is a multi-selection list,
         and ``*items`` is an empty list, all values of the list will be selected.
 
-        It's faster to use 'by index/value/label' keywords.
+        It's faster to use 'by index/value/label' keywords. Options of a multi-selection
+        list are selected in a single browser call followed by a single change event.
 
         An exception is raised for a single-selection list if the last
         value does not exist in the list and a warning for all other non-
@@ -70,8 +167,11 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         Examples:
         | Select From List | css=select.class | item |
         """
-        super(ExtendedSelectElementKeywords, self).select_from_list(locator, *items)
-        self._element_trigger_change(locator)
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        if not self._select_options_in_browser(locator, element, 'item', items):
+            super(ExtendedSelectElementKeywords, self).select_from_list(locator, *items)
+            self._element_trigger_change(element)
 
     def select_from_list_by_index(self, locator, *indexes):
         """Selects ``*indexes`` from list identified by ``locator``.
@@ -86,8 +186,12 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         Examples:
         | Select From List By Index | css=select.class | index |
         """
-        super(ExtendedSelectElementKeywords, self).select_from_list_by_index(locator, *indexes)
-        self._element_trigger_change(locator)
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        items = [int(index) for index in indexes]
+        if not items or not self._select_options_in_browser(locator, element, 'index', items):
+            super(ExtendedSelectElementKeywords, self).select_from_list_by_index(locator, *indexes)
+            self._element_trigger_change(element)
 
     def select_from_list_by_label(self, locator, *labels):
         """Selects ``*labels`` from list identified by ``locator``.
@@ -102,8 +206,11 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         Examples:
         | Select From List By Label | css=select.class | label |
         """
-        super(ExtendedSelectElementKeywords, self).select_from_list_by_label(locator, *labels)
-        self._element_trigger_change(locator)
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        if not labels or not self._select_options_in_browser(locator, element, 'label', labels):
+            super(ExtendedSelectElementKeywords, self).select_from_list_by_label(locator, *labels)
+            self._element_trigger_change(element)
 
     def select_from_list_by_value(self, locator, *values):
         """Selects ``*values`` from list identified by ``locator``.
@@ -118,13 +225,53 @@ class ExtendedSelectElementKeywords(_SelectElementKeywords):
         Examples:
         | Select From List By Value | css=select.class | value |
         """
-        super(ExtendedSelectElementKeywords, self).select_from_list_by_value(locator, *values)
-        self._element_trigger_change(locator)
+        # pylint: disable=no-member
+        element = self._element_find(locator, True, True, 'select')
+        if not values or not self._select_options_in_browser(locator, element, 'value', values):
+            super(ExtendedSelectElementKeywords, self).select_from_list_by_value(locator, *values)
+            self._element_trigger_change(element)
+
+    def _get_selected_list_snapshot(self, locator):
+        """Returns the snapshot of selected options, fails if there is no selection."""
+        snapshot = self.get_list_snapshot(locator, selected_only=True)
+        if not snapshot['labels']:
+            raise ValueError("Select list with locator '%s' does not have any selected values" %
+                             locator)
+        return snapshot
+
+    def _select_options_in_browser(self, locator, element, select_by, items):
+        """Selects all requested options of a multi-select list in one browser call and fires
+        a single change event. Returns false when the list is not a multi-select list."""
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        missing = browser.execute_script(self.SELECT_OPTIONS_SCRIPT, element, select_by,
+                                         list(items))
+        if missing is None:
+            return False
+        items_str = 'all options'
+        if items:
+            items_str = "%s '%s'" % (self.SELECT_ITEM_NAMES[select_by],
+                                     ', '.join(str(item) for item in items))
+        # pylint: disable=no-member
+        self._info("Selecting %s from list '%s'." % (items_str, locator))
+        if missing:
+            if select_by == 'index':
+                raise NoSuchElementException('Could not locate element with index %d' %
+                                             missing[0])
+            if select_by == 'label':
+                raise NoSuchElementException('Could not locate element with visible text: %s' %
+                                             missing[0])
+            if select_by == 'value':
+                raise NoSuchElementException('Cannot locate option with value: %s' % missing[0])
+            raise ValueError("Options '%s' not in list '%s'." % (', '.join(missing), locator))
+        # pylint: disable=no-member
+        self._wait_until_page_ready(skip_stale_check=True)
+        return True
 
-    def _element_trigger_change(self, locator):
+    def _element_trigger_change(self, element):
         """Trigger change event on target element when AngularJS is ready."""
         # pylint: disable=no-member
-        self._wait_until_page_ready(locator,
+        self._wait_until_page_ready(element,
                                     skip_stale_check=True,
                                     prefix='var cb=arguments[arguments.length-1];'
                                            'var el=arguments[0];if(window.angular){',
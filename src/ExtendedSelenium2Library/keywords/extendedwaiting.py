@@ -21,10 +21,12 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
+from json import dumps
 from sys import exc_info
-from time import sleep
+from time import sleep, time
 from robot import utils
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchWindowException, StaleElementReferenceException, \
+    TimeoutException, WebDriverException
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support.expected_conditions import staleness_of, visibility_of
 from selenium.webdriver.support.ui import WebDriverWait
@@ -35,8 +37,73 @@ from ExtendedSelenium2Library.decorators import inherit_docs
 @inherit_docs
 class ExtendedWaitingKeywords(_WaitingKeywords):
     """ExtendedWaitingKeywords are waiting related execution towards the requested browser."""
+
+    ATTRIBUTE_WATCHER = 'var cb=arguments[arguments.length-1],p=arguments[0],s=arguments[1],' \
+                        'q=arguments[2],b=new Date().getTime(),o=[],d=false,t,i;' \
+                        'function g(el,a){var v=(a in el&&el[a]!=null&&' \
+                        'typeof el[a]!==\'object\'&&typeof el[a]!==\'function\')?' \
+                        'el[a]:el.getAttribute(a);if(typeof v===\'boolean\'){v=v?\'true\':null}' \
+                        'return v==null?\'\':String(v)}' \
+                        'function m(){var r=[];for(var j=0;j<p.length;j++){' \
+                        'if((g(p[j][0],p[j][1]).indexOf(p[j][2])>-1)===p[j][3]){r.push(j)}}' \
+                        'return r}' \
+                        'function e(r){if(d){return}d=true;clearTimeout(t);' \
+                        'for(var j=0;j<o.length;j++){o[j].disconnect()}cb(r)}' \
+                        'function f(){if(d){return}var r=m();' \
+                        'if(!r.length||new Date().getTime()-b>=s){e(r)}else{t=setTimeout(f,q)}}' \
+                        'if(window.MutationObserver){for(i=0;i<p.length;i++){' \
+                        'o.push(new MutationObserver(function(){var r=m();if(!r.length){e(r)}}));' \
+                        'o[i].observe(p[i][0],{attributes:true,attributeFilter:[p[i][1]]})}}f()'
+    ERROR_CAPTURE_WRAPPER = 'var a=[].slice.call(arguments),done=a.pop(),w=window,' \
+                            'ns=w.__es2l=w.__es2l||{};if(!ns.errors){ns.errors=[];' \
+                            'var p=function(m){if(ns.errors.length<%(limit)d){ns.errors.push(' \
+                            '{level:\'SEVERE\',message:String(m),source:\'javascript\',' \
+                            'timestamp:new Date().getTime()})}},o=w.onerror;' \
+                            'w.onerror=function(m,u,l){p(m+(u?\' \'+u+\':\'+l:\'\'));' \
+                            'return o?o.apply(this,arguments):false};' \
+                            'if(w.addEventListener){w.addEventListener(\'unhandledrejection\',' \
+                            'function(e){var r=e.reason;' \
+                            'p(\'Unhandled rejection: \'+(r&&r.message||r))})}' \
+                            'if(w.console&&console.error){var ce=console.error;' \
+                            'console.error=function(){p([].slice.call(arguments).join(\' \'));' \
+                            'return Function.prototype.apply.call(ce,console,arguments)}}}' \
+                            'a.push(function(r){var e=ns.errors.splice(0,ns.errors.length);' \
+                            'done(e.length?{__es2lErrors:e,response:r}:r)});' \
+                            '(function(){%(script)s}).apply(this,a)'
+    LOCATION_WATCHER = 'var cb=arguments[arguments.length-1],x=arguments[0],n=arguments[1],' \
+                       's=arguments[2],w=window,ns=w.__es2l=w.__es2l||{},' \
+                       'l=ns.locationListeners,d,t;' \
+                       'function m(){return(w.location.href.indexOf(x)>-1)!==n}' \
+                       'if(m()){return cb(w.location.href)}' \
+                       'if(!l){l=ns.locationListeners=[];' \
+                       'var f=function(){var c=l.slice();for(var i=0;i<c.length;i++){c[i]()}};' \
+                       'if(w.history){[\'pushState\',\'replaceState\'].forEach(function(k){' \
+                       'var o=w.history[k];if(o){w.history[k]=function(){' \
+                       'var r=o.apply(this,arguments);f();return r}}})}' \
+                       'w.addEventListener(\'popstate\',f);w.addEventListener(\'hashchange\',f)}' \
+                       'function e(v){var i=l.indexOf(d);clearTimeout(t);if(i>-1){l.splice(i,1)}cb(v)}' \
+                       'd=function(){if(m()){e(w.location.href)}};l.push(d);' \
+                       't=setTimeout(function(){e(null)},s)'
+    PAGE_READY_PROBE_WRAPPER = 'var a=[].slice.call(arguments),done=a.pop(),' \
+                               'ns=window.__es2l=window.__es2l||{},st=ns.state,' \
+                               'c=%(conditions)s,p=%(state)s,e=new Date().getTime()+%(deadline)d;' \
+                               'if(!st){st=ns.state={id:Math.random().toString(36).slice(2),n:0};' \
+                               'if(window.MutationObserver&&document.documentElement){' \
+                               'new MutationObserver(function(){st.n++}).observe(' \
+                               'document.documentElement,{attributes:true,childList:true,' \
+                               'subtree:true})}}' \
+                               'a.push(function(r){var b=new Date().getTime(),t={},' \
+                               'ch=!p||p.join(\'|\')!==[st.id,st.n,location.href].join(\'|\');' \
+                               'function f(){var k,m=0,now=new Date().getTime();' \
+                               'if(ch){for(k in c){if(!(k in t)){try{if(c[k]())t[k]=now-b}' \
+                               'catch(ex){}if(!(k in t))m++}}}' \
+                               'if(m&&now<e){setTimeout(f,%(poll)d)}else{done({changed:ch,' \
+                               'response:r,state:[st.id,st.n,location.href],timings:t})}}f()});' \
+                               '(function(){%(script)s}).apply(this,a)'
+
     def __init__(self):
         super(ExtendedWaitingKeywords, self).__init__()
+        self._page_ready_state = None
 
     def fast_wait_until_page_contains(self, text, excludes=None, timeout=None, error=None):
         """Waits until ``text`` appears on current page.
@@ -134,10 +201,12 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         if not error:
             error = "Condition '%s' did not become true in %s" % \
                 (condition, self._format_timeout(timeout))
+        # variables are replaced once, each poll only executes the compiled condition
         # pylint: disable=no-member
-        WebDriverWait(self, timeout, self._inputs['poll_frequency']).\
-            until(lambda driver:
-                  driver.execute_javascript_with_replaced_variables(condition) is True, error)
+        js_code, arguments = self._get_compiled_javascript(condition)
+        # pylint: disable=no-member
+        WebDriverWait(self._current_browser(), timeout, self._inputs['poll_frequency']).\
+            until(lambda driver: driver.execute_script(js_code, *arguments) is True, error)
 
     def wait_until_angular_ready(self, timeout=None, error=None):
         """Waits until [https://goo.gl/Kzz8Y3|AngularJS] is ready to process the next request or
@@ -244,10 +313,7 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         if not error:
             error = "Element did not contain attribute '%s' after %s" %\
                     (expected, self._format_timeout(timeout))
-        # pylint: disable=no-member
-        WebDriverWait(self, timeout, self._inputs['poll_frequency']).\
-            until(lambda driver: expected in driver.get_element_attribute(attribute_locator),
-                  error)
+        self._wait_until_attributes_match([(attribute_locator, expected, False)], timeout, error)
 
     def wait_until_element_does_not_contain_attribute(self, attribute_locator, unexpected,
                                                       timeout=None, error=None):
@@ -278,10 +344,40 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         if not error:
             error = "Element was still contain attribute '%s' after %s" %\
                     (unexpected, self._format_timeout(timeout))
+        self._wait_until_attributes_match([(attribute_locator, unexpected, True)], timeout, error)
+
+    def wait_until_elements_contain_attributes(self, expectations, timeout=None, error=None):
+        # pylint: disable=line-too-long
+        """Waits until every element attribute in ``expectations`` contains its expected value.
+        Fails if ``timeout`` expires before all the expected element attributes
+        present on the page.
+
+        Arguments:
+        - ``expectations``: A dictionary of attribute locators and their expected values.
+                            See `Wait Until Element Contains Attribute` for more information
+                            about attribute locators.
+        - ``timeout``: The maximum value to wait for all element attributes to contain
+                       their expected values.
+                       See `introduction` for more information about ``timeout`` and
+                       its default value.
+        - ``error``: The value that would be use to override the default error message.
+
+        See also `Wait Until Element Contains Attribute`, `Wait Until Page Contains Element`,
+        `Wait For Condition` and BuiltIn keyword `Wait Until Keyword Succeeds`.
+
+        Examples:
+        | ${expectations} =                      | Evaluate        | {'css=div.a@class': 'active', 'css=div.b@class': 'done'} |
+        | Wait Until Elements Contain Attributes | ${expectations} |                                                          |
+        """
+        # pylint: disable=line-too-long
         # pylint: disable=no-member
-        WebDriverWait(self, timeout, self._inputs['poll_frequency']).\
-            until_not(lambda driver: unexpected in driver.get_element_attribute(attribute_locator),
-                      error)
+        timeout = self._get_timeout_value(timeout, self._timeout_in_secs)
+        if not error:
+            error = "Elements did not contain attributes %s after %s" %\
+                    (expectations, self._format_timeout(timeout))
+        self._wait_until_attributes_match([(attribute_locator, expected, False)
+                                           for attribute_locator, expected
+                                           in expectations.items()], timeout, error)
 
     # pylint: disable=missing-docstring
     def wait_until_element_is_not_visible(self, locator, timeout=None, error=None):
@@ -331,8 +427,7 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         if not error:
             error = "Location did not contain '%s' after %s" %\
                     (expected, self._format_timeout(timeout))
-        WebDriverWait(self, timeout, self._inputs['poll_frequency']).\
-            until(lambda driver: expected in driver.get_location(), error)
+        self._wait_until_location_matches(expected, False, timeout, error)
 
     def wait_until_location_does_not_contain(self, unexpected, timeout=None, error=None):
         """Waits until current URL does not contain ``unexpected``.
@@ -357,14 +452,117 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         if not error:
             error = "Location was still contain '%s' after %s" %\
                     (unexpected, self._format_timeout(timeout))
-        WebDriverWait(self, timeout, self._inputs['poll_frequency']).\
-            until_not(lambda driver: unexpected in driver.get_location(), error)
+        self._wait_until_location_matches(unexpected, True, timeout, error)
+
+    def _get_page_ready_probe_script(self, script, timeout):
+        """Returns ``script`` wrapped with page state change detection and
+        registered page ready conditions check. Unmet conditions are only checked once more
+        after a poll, their keywords run otherwise."""
+        # pylint: disable=no-member
+        poll = int(self._inputs['poll_frequency'] * 1000)
+        deadline = min(poll, max(int(timeout * 1000) - 2 * poll, 0))
+        conditions = ','.join('%s:function(){return (%s)}' % (dumps(name), condition)
+                              for name, condition in self._page_ready_conditions.items())
+        return self.PAGE_READY_PROBE_WRAPPER % {'conditions': '{%s}' % conditions,
+                                                'deadline': deadline,
+                                                'poll': poll,
+                                                'script': script,
+                                                'state': dumps(self._page_ready_state)}
+
+    def _drain_javascript_errors(self, response):
+        """Stores the JavaScript errors captured in the page into the browser logs,
+        and returns the actual ``response``."""
+        if isinstance(response, dict) and '__es2lErrors' in response:
+            # pylint: disable=no-member
+            self._store_browser_logs(response['__es2lErrors'])
+            return response['response']
+        return response
+
+    def _get_attribute_expectation(self, attribute_locator, value, negate):
+        """Returns the element, attribute name, value and negate flag for the attribute watcher."""
+        # pylint: disable=no-member
+        locator, attribute_name = self._parse_attribute_locator(attribute_locator)
+        return [self._element_find(locator, True, True), attribute_name, value, negate]
 
     @staticmethod
     def _get_timeout_value(timeout, default):
         """Returns default timeout when timeout is None."""
         return default if timeout is None else utils.timestr_to_secs(timeout)
 
+    def _is_capturing_javascript_errors(self):
+        """Returns true if JavaScript errors should be captured in the page."""
+        # pylint: disable=no-member
+        capture_errors = self._inputs['capture_javascript_errors']
+        if capture_errors is None:
+            # only when the browser logs are not available
+            # pylint: disable=no-member
+            return self._is_internet_explorer() or \
+                not self._get_browser_log_collector()['supported']
+        return capture_errors
+
+    @staticmethod
+    def _is_navigation_error(error):
+        """Returns true if ``error`` is a transient error of a script interrupted by
+        a navigation, e.g. the document or the window went away while it was running."""
+        if isinstance(error, (NoSuchWindowException, StaleElementReferenceException)):
+            return True
+        return 'unload' in (error.msg or '').lower()
+
+    def _run_page_ready_keywords(self, probe):
+        """Runs registered page ready keywords when the page state has changed
+        and reports their individual timings."""
+        results = {'page_ready_keywords': [], 'page_ready_timings': {}}
+        self._page_ready_state = probe.get('state')
+        if not probe.get('changed'):
+            return results
+        timings = results['page_ready_timings']
+        for name, elapsed in probe.get('timings', {}).items():
+            timings[name] = elapsed / 1000.0
+        # pylint: disable=no-member
+        met_conditions = set(timings)
+        for keyword in self._page_ready_keyword_list:
+            if keyword in met_conditions:
+                continue
+            if keyword in self._page_ready_conditions:
+                # the keyword itself decides whether the page is not ready
+                self._info("Page ready condition '%s' was not met, running the keyword." %
+                           keyword)
+            start = time()
+            results['page_ready_keywords'].append(self._builtin.run_keyword(keyword))
+            timings[keyword] = time() - start
+        for keyword in self._page_ready_keyword_list:
+            if keyword in timings:
+                self._info("Page ready keyword '%s' took %s." %
+                           (keyword, self._format_timeout(timings[keyword])))
+        return results
+
+    def _set_document(self, browser, document_id):
+        """Called with the id of the html element of the document selected in the browser,
+        before its stale check."""
+
+    def _wait_until_attributes_match(self, expectations, timeout, error):
+        """Waits until all ``expectations`` of attribute locator, value and negate flag are met
+        by observing the attribute mutations in the browser instead of polling."""
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        poll = int(self._inputs['poll_frequency'] * 1000)
+        end = time() + timeout
+        while True:
+            # every element is resolved once per watch instead of once per poll
+            pairs = [self._get_attribute_expectation(*expectation)
+                     for expectation in expectations]
+            remaining = max(end - time(), 0)
+            try:
+                if self._wait_until_script_ready(browser, remaining + 1, self.ATTRIBUTE_WATCHER,
+                                                 pairs, int(remaining * 1000), poll) == []:
+                    return
+            except StaleElementReferenceException:
+                # the element was re-rendered while watching, watch the new one
+                # pylint: disable=no-member
+                self._debug(exc_info()[0])
+            if time() >= end:
+                raise TimeoutException(error)
+
     def _wait_until_html_ready(self, browser, timeout):
         """Wait until HTML is ready by using stale check."""
         # pylint: disable=no-member
@@ -374,9 +572,11 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
         # let the browser take a deep breath...
         sleep(delay)
         try:
+            html = browser.find_element_by_tag_name('html')
+            self._set_document(browser, html.id)
             # pylint: disable=no-member
             WebDriverWait(None, timeout, self._inputs['poll_frequency']).\
-                until_not(staleness_of(browser.find_element_by_tag_name('html')), '')
+                until_not(staleness_of(html), '')
         # pylint: disable=bare-except
         except:  # noqa: E722
             # instead of halting the process because document is not ready
@@ -384,10 +584,34 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
             # pylint: disable=no-member
             self._debug(exc_info()[0])
 
+    def _wait_until_location_matches(self, value, negate, timeout, error):
+        """Waits until current URL contains ``value``, or does not contain it when ``negate``
+        is true, by watching location changes in the browser instead of polling."""
+        # pylint: disable=no-member
+        browser = self._current_browser()
+        end = time() + timeout
+        while True:
+            remaining = max(end - time(), 0)
+            try:
+                # give the browser a second more than the in-page watcher to report back
+                if self._wait_until_script_ready(browser, remaining + 1, self.LOCATION_WATCHER,
+                                                 value, negate, int(remaining * 1000)):
+                    return
+            except WebDriverException:
+                # the document was unloaded while watching, watch the new one
+                if not self._is_navigation_error(exc_info()[1]):
+                    raise
+                # pylint: disable=no-member
+                self._debug(exc_info()[0])
+                sleep(self._inputs['poll_frequency'])
+            if time() >= end:
+                raise TimeoutException(error)
+
     def _wait_until_page_ready(self, *args, **kwargs):
         """Semi blocking API that incorporated different strategies for cross-browser support."""
         responses = {
             'page_ready_keywords': [],
+            'page_ready_timings': {},
             'response': kwargs.pop('default', None)
         }
         # pylint: disable=no-member
@@ -418,10 +642,25 @@ class ExtendedWaitingKeywords(_WaitingKeywords):
             args[locator_position] = self._element_find(args[locator_position], True, True)
         if not skip_stale_check:
             self._wait_until_html_ready(browser, timeout)
-        responses['response'] = self._wait_until_script_ready(browser, timeout, script, *args)
         # pylint: disable=no-member
-        responses['page_ready_keywords'] = [self._builtin.run_keyword(keyword)
-                                            for keyword in self._page_ready_keyword_list]
+        probe_keywords = bool(self._page_ready_keyword_list)
+        if probe_keywords:
+            script = self._get_page_ready_probe_script(script, timeout)
+        capture_errors = self._is_capturing_javascript_errors()
+        if capture_errors:
+            script = self.ERROR_CAPTURE_WRAPPER % {'limit': self._inputs['browser_log_size'],
+                                                   'script': script}
+        probe = self._wait_until_script_ready(browser, timeout, script, *args)
+        if capture_errors:
+            probe = self._drain_javascript_errors(probe)
+        if not probe_keywords:
+            responses['response'] = probe
+            return responses
+        if not isinstance(probe, dict):
+            # the probe didn't come back in time, assume the page has changed
+            probe = {'changed': True, 'response': None, 'state': None, 'timings': {}}
+        responses['response'] = probe.get('response')
+        responses.update(self._run_page_ready_keywords(probe))
         return responses
 
     def _wait_until_script_ready(self, browser, timeout, script, *args):
@@ -21,75 +21,431 @@
 Extended Selenium2 Library - a web testing library with AngularJS support.
 """
 
+from collections import OrderedDict
+from time import time
+from selenium.common.exceptions import NoSuchFrameException, StaleElementReferenceException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from Selenium2Library.locators import ElementFinder
 
 
+# pylint: disable=too-many-instance-attributes
 class ExtendedElementFinder(ElementFinder):
     """ExtendedElementFinder is a web element finder with
     [https://goo.gl/00Q8qX|Protractor locators] support."""
 
-    BUTTON_TEXT_WRAPPER = "return [].filter.call(document.querySelectorAll('button," \
-                          "input[type=\"button\"],input[type=\"submit\"]')," \
-                          "function(item){var text=(item.nodeName.toLowerCase()==='button')?" \
-                          "(item.textContent||item.innerText||''):item.value;%(handler)s})"
+    CONTAINER_SEPARATOR = ' >> '
+    # these strategies look up elements in the whole page, normalized like strategy names
+    CONTAINER_UNSUPPORTED_STRATEGIES = ('dom', 'frame', 'jquery', 'sclocator', 'sizzle')
+    # these strategies can stop at the first match, normalized like strategy names
+    FIRST_ONLY_STRATEGIES = ('binding', 'button', 'exactrepeater', 'frame', 'model', 'options',
+                             'partialbinding', 'partialbutton', 'repeater', 'shadow')
+    FRAME_CACHE_SIZE = 32
+    FINDER_WRAPPER = "var root=arguments[0]||document,opts=arguments[1]||{}," \
+                     "args=[].slice.call(arguments,2),items=%(elements)s,found=[],item,i,k,ok;" \
+                     "for(i=0;i<items.length;i++){item=items[i];" \
+                     "ok=!opts.tag||item.nodeName.toLowerCase()===opts.tag;" \
+                     "for(k in opts.constraints){" \
+                     "ok=ok&&(k==='type'?item.type:item.getAttribute(k))===opts.constraints[k]}" \
+                     "if(ok&&(function(item){%(handler)s})(item)){found.push(item);" \
+                     "if(opts.first){break}}}return found"
 
-    NG_BINDING_WRAPPER = "return [].filter.call(document.getElementsByClassName('ng-binding')," \
-                         "function(item){var binding=angular.element(item).data('$binding');" \
-                         "if(binding){var name=binding.exp||binding[0].exp||binding;%(handler)s}})"
+    BUTTON_TEXT_WRAPPER = FINDER_WRAPPER % {
+        'elements': "root.querySelectorAll('button,input[type=\"button\"],"
+                    "input[type=\"submit\"]')",
+        'handler': "var text=(item.nodeName.toLowerCase()==='button')?"
+                   "(item.textContent||item.innerText||''):item.value;%(handler)s"
+    }
+
+    NG_BINDING_WRAPPER = FINDER_WRAPPER % {
+        'elements': "root.getElementsByClassName('ng-binding')",
+        'handler': "var binding=angular.element(item).data('$binding');"
+                   "if(binding){var name=binding.exp||binding[0].exp||binding;%(handler)s}"
+    }
+
+    NG_PREFIX_SCRIPT = "var p=arguments[0],u=[],i;for(i=0;i<p.length;i++){" \
+                       "if(document.querySelector('['+p[i]+'app],['+p[i]+'bind],['+p[i]+" \
+                       "'controller],['+p[i]+'model],['+p[i]+'options],['+p[i]+'repeat]')){" \
+                       "u.push(p[i])}}return u"
+    NG_REPEATER_SCRIPT = FINDER_WRAPPER % {
+        'elements': "(function(e,n,r,x,row,col){var m=[],o=[],i,j,v,c,b;"
+                    "function ok(v){v=v.split(' track by ')[0];"
+                    "return x?v.split(' | ')[0].replace(/^\\s+|\\s+$/g,'')===r:"
+                    "v.indexOf(r)>-1}"
+                    "for(i=0;i<e.length;i++){for(j=0;j<n.length;j++){"
+                    "v=e[i].getAttribute(n[j]);if(v&&ok(v)){m.push(e[i]);break}}}"
+                    "if(row!==null){m=m[row]?[m[row]]:[]}if(col===null){return m}"
+                    "for(i=0;i<m.length;i++){c=m[i].getElementsByClassName('ng-binding');"
+                    "for(j=0;j<c.length;j++){b=angular.element(c[j]).data('$binding');"
+                    "if(b&&(b.exp||b[0].exp||b).indexOf(col)>-1){o.push(c[j])}}}return o})"
+                    "(root.querySelectorAll(args[0]),args[1],args[2],args[3],args[4],args[5])",
+        'handler': 'return true'
+    }
+    PATH_SEPARATOR = ' |> '
+    SHADOW_SCRIPT = FINDER_WRAPPER % {
+        'elements': "(function(p,root){var ns=window.__es2l=window.__es2l||{},"
+                    "c=root===document?ns.shadowHosts=ns.shadowHosts||{}:{},k='',h,i;"
+                    "function f(r,s,o){var m=r.querySelectorAll(s),e=r.querySelectorAll('*'),j;"
+                    "for(j=0;j<m.length;j++){o.push(m[j])}"
+                    "for(j=0;j<e.length;j++){if(e[j].shadowRoot){f(e[j].shadowRoot,s,o)}}"
+                    "return o}"
+                    "for(i=0;i<p.length-1;i++){k+=p[i]+'\\n';h=c[k];"
+                    "if(!h||!h.isConnected||!h.shadowRoot){h=c[k]=f(root,p[i],[])."
+                    "filter(function(x){return x.shadowRoot})[0]}"
+                    "if(!h){return []}root=h.shadowRoot}return f(root,p[p.length-1],[])})"
+                    "(args[0],root)",
+        'handler': 'return true'
+    }
 
     def __init__(self):
         ElementFinder.__init__(self)
         strategies = {
             'binding': self._find_by_ng_binding,
             'button': self._find_by_button_text,
+            'exact repeater': self._find_by_ng_repeater_exact,
+            'frame': self._find_by_frame,
             'model': self._find_by_ng_model,
             'options': self._find_by_ng_options,
             'partial binding': self._find_by_ng_binding_partial,
-            'partial button': self._find_by_button_text_partial
+            'partial button': self._find_by_button_text_partial,
+            'repeater': self._find_by_ng_repeater,
+            'shadow': self._find_by_shadow
         }
         self._strategies.update(strategies)
         self._default_strategies = list(self._strategies.keys())
+        self._documents = {}
+        self._frame_elements = OrderedDict()
+        self._frame_paths = {}
         self._ng_prefixes = ['ng-', 'data-ng-', 'ng_', 'x-ng-', 'ng\\:']
+        self._ng_prefixes_in_use = {}
+        self._ng_selectors = {}
+        self._statistics = None
+
+    def enable_statistics(self):
+        """Starts recording the lookup statistics of every locator."""
+        if self._statistics is None:
+            self._statistics = {}
+
+    # pylint: disable=arguments-differ
+    def find(self, browser, locator, tag=None, first_only=False):
+        """Find element matches inside the optional container chain, switching back to the top
+        frame first when the previous frame locator left the browser inside its frame chain.
+        The finder scripts stop at the first match when ``first_only`` is true."""
+        if self._statistics is None:
+            return self._find(browser, locator, tag, first_only)
+        start = time()
+        elements = self._find(browser, locator, tag, first_only)
+        self._record_statistics(locator, time() - start, len(elements))
+        return elements
+
+    def get_statistics(self):
+        """Returns the recorded lookup statistics ranked by their total lookup time."""
+        return sorted((dict(statistics) for statistics in (self._statistics or {}).values()),
+                      key=lambda statistics: statistics['time'], reverse=True)
+
+    def set_document(self, browser, document_id):
+        """Sets the id of the html element of the document selected in the browser, the cached
+        frame elements and ng prefixes of the browser are forgotten when its document has
+        changed."""
+        key = (browser.session_id, self._frame_paths.get(browser.session_id))
+        if self._documents.get(key, document_id) != document_id:
+            self._forget_documents(browser.session_id)
+        self._documents[key] = document_id
+
+    def set_frame_path(self, browser, frames=None):
+        """Sets the frame chain selected in the browser, None when it is unknown.
+        The cached frame elements and ng prefixes of the browser are forgotten."""
+        self._forget_documents(browser.session_id)
+        self._frame_paths[browser.session_id] = frames
 
-    def _find_by_button_text(self, browser, button_text, tag, constraints):
+    def _execute_finder_script(self, browser, script, tag, constraints, first_only, *arguments):
+        """Returns the element matches of the finder script, filtered by tag and constraints
+        in the browser, inside the container when ``browser`` is a container element.
+        The finder script stops at the first match when ``first_only`` is true."""
+        # pylint: disable=too-many-arguments
+        root = None
+        if isinstance(browser, WebElement):
+            browser, root = browser.parent, browser
+        return self._normalize_result(browser.execute_script(script, root,
+                                                             {'constraints': constraints,
+                                                              'first': first_only,
+                                                              'tag': tag}, *arguments))
+
+    def _find(self, browser, locator, tag, first_only):
+        """Find element matches inside the optional container chain."""
+        assert browser is not None
+        assert locator
+        prefix = self._normalize_prefix(self._parse_locator(locator)[0])
+        if self._frame_paths.get(browser.session_id) and prefix != 'frame':
+            browser.switch_to_default_content()
+            self._frame_paths[browser.session_id] = ()
+        (tag, constraints) = self._get_tag_and_constraints(tag)
+        path = self._get_locator_path(locator)
+        for container in path[:-1]:
+            elements = self._find_by_locator(browser, container, None, {}, True)
+            if not elements:
+                return []
+            browser = _ContainerElement(elements[0])
+        return self._find_by_locator(browser, path[-1], tag, constraints, first_only)
+
+    def _find_by_button_text(self, browser, button_text, tag, constraints, first_only=False):
         """Find button matches by exact text."""
+        # pylint: disable=too-many-arguments
         # pylint: disable=anomalous-backslash-in-string
         script = self.BUTTON_TEXT_WRAPPER \
             % {'handler': "return text.replace(/^\s+|\s+$/g,'')==='%s'" % button_text}
-        return self._filter_elements(browser.execute_script(script), tag, constraints)
+        return self._execute_finder_script(browser, script, tag, constraints, first_only)
 
-    def _find_by_button_text_partial(self, browser, button_text, tag, constraints):
+    def _find_by_button_text_partial(self, browser, button_text, tag, constraints,
+                                     first_only=False):
         """Find button matches by partial text."""
+        # pylint: disable=too-many-arguments
         script = self.BUTTON_TEXT_WRAPPER % \
             {'handler': "return text.indexOf('%s')>-1" % button_text}
-        return self._filter_elements(browser.execute_script(script), tag, constraints)
+        return self._execute_finder_script(browser, script, tag, constraints, first_only)
+
+    def _find_by_frame(self, browser, criteria, tag, constraints, first_only=False):
+        """Find element matches inside nested frames, the frame chain is only selected when
+        it differs from the currently selected one. The browser stays inside the frame chain,
+        so that the matches can be used."""
+        # pylint: disable=too-many-arguments
+        path = [item.strip() for item in criteria.split(self.PATH_SEPARATOR)]
+        frames = tuple(path[:-1])
+        if self._frame_paths.get(browser.session_id) == frames:
+            try:
+                elements = self._find_by_locator(browser, path[-1], tag, constraints, first_only)
+            except (NoSuchFrameException, StaleElementReferenceException):
+                elements = None
+            # the document might have changed since the frame chain was selected
+            if elements:
+                return elements
+        if not self._select_frames(browser, frames):
+            return []
+        return self._find_by_locator(browser, path[-1], tag, constraints, first_only)
+
+    def _find_by_locator(self, browser, locator, tag, constraints, first_only=False):
+        """Find element matches with the strategy of the locator prefix."""
+        # pylint: disable=too-many-arguments
+        (prefix, criteria) = self._parse_locator(locator)
+        prefix = 'default' if prefix is None else prefix
+        strategy = self._strategies.get(prefix)
+        if strategy is None:
+            raise ValueError("Element locator with prefix '" + prefix + "' is not supported")
+        name = self._normalize_prefix(prefix)
+        if isinstance(browser, WebElement) and name in self.CONTAINER_UNSUPPORTED_STRATEGIES:
+            raise ValueError("Element locator with prefix '%s' is not supported "
+                             "inside a container" % prefix)
+        if name in self.FIRST_ONLY_STRATEGIES:
+            return strategy(browser, criteria, tag, constraints, first_only)
+        return strategy(browser, criteria, tag, constraints)
 
-    def _find_by_ng_binding(self, browser, binding_name, tag, constraints):
+    def _find_by_ng_binding(self, browser, binding_name, tag, constraints, first_only=False):
         """Find element matches by exact binding name."""
+        # pylint: disable=too-many-arguments
         # pylint: disable=anomalous-backslash-in-string
         script = self.NG_BINDING_WRAPPER % \
             {'handler': ("var matcher=new RegExp('({|\\s|^|\\|)'+'%s'."
                          # See http://stackoverflow.com/q/3561711
                          "replace(/[\-\[\]\/\{\}\(\)\*\+\?\.\\\^\$\|]/g,'\\$&')"
                          "+'(}|\\s|$|\\|)');return matcher.test(name)") % binding_name}
-        return self._filter_elements(browser.execute_script(script), tag, constraints)
+        return self._execute_finder_script(browser, script, tag, constraints, first_only)
 
-    def _find_by_ng_binding_partial(self, browser, binding_name, tag, constraints):
+    def _find_by_ng_binding_partial(self, browser, binding_name, tag, constraints,
+                                    first_only=False):
         """Find element matches by partial binding name."""
+        # pylint: disable=too-many-arguments
         script = self.NG_BINDING_WRAPPER % \
             {'handler': "return name.indexOf('%s')>-1" % binding_name}
-        return self._filter_elements(browser.execute_script(script), tag, constraints)
+        return self._execute_finder_script(browser, script, tag, constraints, first_only)
 
-    def _find_by_ng_model(self, browser, model_name, tag, constraints):
+    def _find_by_ng_model(self, browser, model_name, tag, constraints, first_only=False):
         """Find element matches by exact model name."""
-        stem = 'model="%s"' % model_name
-        joiner = '%s],[' % stem
-        criteria = '[' + joiner.join(self._ng_prefixes) + stem + ']'
-        return self._find_by_css_selector(browser, criteria, tag, constraints)
+        # pylint: disable=too-many-arguments
+        return self._find_ng_attribute(browser, 'model="%s"' % model_name, None,
+                                       tag, constraints, first_only)
 
-    def _find_by_ng_options(self, browser, descriptor, tag, constraints):
+    def _find_by_ng_options(self, browser, descriptor, tag, constraints, first_only=False):
         """Find options matches by exact descriptor."""
-        stem = 'options="%s"' % descriptor
-        joiner = '%s] option,[' % stem
-        criteria = '[' + joiner.join(self._ng_prefixes) + stem + '] option'
-        return self._find_by_css_selector(browser, criteria, tag, constraints)
+        # pylint: disable=too-many-arguments
+        return self._find_ng_attribute(browser, 'options="%s"' % descriptor, 'option',
+                                       tag, constraints, first_only)
+
+    def _find_by_ng_repeater(self, browser, repeater, tag, constraints, first_only=False):
+        """Find element matches by partial repeater, optionally narrowed down by row index
+        and column binding name."""
+        # pylint: disable=too-many-arguments
+        return self._find_ng_repeater(browser, repeater, False, tag, constraints, first_only)
+
+    def _find_by_ng_repeater_exact(self, browser, repeater, tag, constraints, first_only=False):
+        """Find element matches by exact repeater, optionally narrowed down by row index
+        and column binding name."""
+        # pylint: disable=too-many-arguments
+        return self._find_ng_repeater(browser, repeater, True, tag, constraints, first_only)
+
+    def _find_by_ng_selector(self, browser, prefixes, stem, descendant, tag, constraints):
+        """Find element matches by the CSS selector of the AngularJS attribute with
+        ``prefixes``. The type constraint is checked on the type property instead of the
+        selector, an input without type attribute is a text field too."""
+        # pylint: disable=too-many-arguments
+        attributes = dict((name, value) for name, value in constraints.items() if name != 'type')
+        selector = self._get_ng_selector(prefixes, stem, descendant, tag, attributes)
+        elements = self._find_by_css_selector(browser, selector, None, {})
+        if 'type' not in constraints:
+            return elements
+        return [element for element in elements
+                if element.get_attribute('type') == constraints['type']]
+
+    def _find_by_shadow(self, browser, criteria, tag, constraints, first_only=False):
+        """Find element matches inside open shadow roots, in a single browser call."""
+        # pylint: disable=too-many-arguments
+        path = [item.strip() for item in criteria.split(self.PATH_SEPARATOR)]
+        return self._execute_finder_script(browser, self.SHADOW_SCRIPT, tag, constraints,
+                                           first_only, path)
+
+    def _find_ng_attribute(self, browser, stem, descendant, tag, constraints, first_only):
+        """Find element matches by AngularJS attribute. The first match is looked up with
+        the ng prefixes used by the page, the selector with all ng prefixes is only used when
+        nothing matches. All matches are always looked up with all ng prefixes, as elements
+        rendered later might use other ng prefixes than the detected ones."""
+        # pylint: disable=too-many-arguments
+        if descendant and tag not in (None, descendant):
+            return []
+        if not first_only:
+            return self._find_by_ng_selector(browser, self._ng_prefixes, stem, descendant, tag,
+                                             constraints)
+        driver = browser.parent if isinstance(browser, WebElement) else browser
+        # the ng prefixes in use belong to the document of the selected frame chain
+        key = (driver.session_id, self._frame_paths.get(driver.session_id))
+        prefixes = self._ng_prefixes_in_use.get(key)
+        if prefixes is None:
+            prefixes = driver.execute_script(self.NG_PREFIX_SCRIPT, self._ng_prefixes) or []
+            # nothing might be rendered yet, detect the ng prefixes again on the next lookup
+            if prefixes:
+                self._ng_prefixes_in_use[key] = prefixes
+        if prefixes:
+            elements = self._find_by_ng_selector(browser, prefixes, stem, descendant, tag,
+                                                 constraints)
+            if elements or len(prefixes) == len(self._ng_prefixes):
+                return elements
+        elements = self._find_by_ng_selector(browser, self._ng_prefixes, stem, descendant, tag,
+                                             constraints)
+        if elements:
+            # the document uses other ng prefixes than the detected ones, use all of them
+            self._ng_prefixes_in_use[key] = self._ng_prefixes
+        return elements
+
+    def _find_ng_repeater(self, browser, criteria, exact, tag, constraints, first_only):
+        """Find repeated element matches in a single browser call, only the requested row
+        and column are returned."""
+        # pylint: disable=too-many-arguments
+        path = [item.strip() for item in criteria.split(self.PATH_SEPARATOR)]
+        row = int(path.pop(1)) if len(path) > 1 and path[1].isdigit() else None
+        column = path[1] if len(path) > 1 else None
+        selector = ','.join('[%srepeat]' % prefix for prefix in self._ng_prefixes)
+        attributes = ['%srepeat' % prefix.replace('\\', '') for prefix in self._ng_prefixes]
+        return self._execute_finder_script(browser, self.NG_REPEATER_SCRIPT, tag, constraints,
+                                           first_only, selector, attributes, path[0], exact,
+                                           row, column)
+
+    def _forget_documents(self, session_id):
+        """Forgets the documents of the browser session, with their cached frame elements
+        and ng prefixes in use."""
+        for cache in (self._documents, self._frame_elements, self._ng_prefixes_in_use):
+            for key in [k for k in cache if k[0] == session_id]:
+                del cache[key]
+
+    def _get_locator_path(self, locator):
+        """Returns the container locators followed by the element locator, the locator is only
+        split before the locators with a known strategy prefix."""
+        path = []
+        for part in locator.split(self.CONTAINER_SEPARATOR):
+            if path and (self._parse_locator(part.strip())[0] or '') not in self._strategies:
+                # the separator is part of the previous locator, e.g. in an XPath expression
+                path[-1] += self.CONTAINER_SEPARATOR + part
+            else:
+                path.append(part)
+        return [part.strip() for part in path]
+
+    def _get_ng_selector(self, prefixes, stem, descendant, tag, constraints):
+        """Returns the cached CSS selector of the AngularJS attribute with ``prefixes``,
+        filtered by tag and constraints."""
+        # pylint: disable=too-many-arguments
+        filters = ''.join('[%s="%s"]' % (name, constraints[name]) for name in sorted(constraints))
+        key = (tuple(prefixes), stem, descendant, tag, filters)
+        if key not in self._ng_selectors:
+            if descendant:
+                selectors = ['[%s%s] %s%s' % (prefix, stem, descendant, filters)
+                             for prefix in prefixes]
+            else:
+                selectors = ['%s[%s%s]%s' % (tag or '', prefix, stem, filters)
+                             for prefix in prefixes]
+            self._ng_selectors[key] = ','.join(selectors)
+        return self._ng_selectors[key]
+
+    @staticmethod
+    def _normalize_prefix(prefix):
+        """Returns the locator prefix normalized like the strategy names."""
+        return (prefix or '').replace(' ', '').lower()
+
+    def _record_statistics(self, locator, elapsed, matches):
+        """Records the lookup time and the number of matches of the locator, a lookup without
+        matches is counted as a retry."""
+        statistics = self._statistics.get(locator)
+        if statistics is None:
+            prefix = self._parse_locator(self._get_locator_path(locator)[-1])[0]
+            statistics = self._statistics[locator] = {
+                'locator': locator, 'lookups': 0, 'matches': 0, 'max_time': 0.0, 'retries': 0,
+                'strategy': prefix or 'default', 'time': 0.0
+            }
+        statistics['lookups'] += 1
+        statistics['matches'] = matches
+        statistics['max_time'] = max(statistics['max_time'], elapsed)
+        statistics['time'] += elapsed
+        if not matches:
+            statistics['retries'] += 1
+
+    def _select_frames(self, browser, frames):
+        """Selects the frame chain from the top frame, reusing the frame elements found
+        in the current document. Returns false when a frame does not exist."""
+        browser.switch_to_default_content()
+        self._frame_paths[browser.session_id] = ()
+        for index, frame in enumerate(frames):
+            key = (browser.session_id,) + frames[:index + 1]
+            element = self._frame_elements.pop(key, None)
+            if element is not None:
+                try:
+                    browser.switch_to_frame(element)
+                except (NoSuchFrameException, StaleElementReferenceException):
+                    element = None
+            if element is None:
+                elements = self._find_by_locator(browser, frame, None, {}, True)
+                if not elements:
+                    return False
+                element = elements[0]
+                browser.switch_to_frame(element)
+            # keep the most recently used frame elements only
+            self._frame_elements[key] = element
+            while len(self._frame_elements) > self.FRAME_CACHE_SIZE:
+                self._frame_elements.popitem(False)
+            self._frame_paths[browser.session_id] = frames[:index + 1]
+        return True
+
+
+class _ContainerElement(WebElement):
+    """_ContainerElement is a container of a scoped lookup, which keeps absolute XPath lookups
+    inside of it."""
+
+    def __init__(self, element):
+        # pylint: disable=protected-access
+        WebElement.__init__(self, element.parent, element.id, element._w3c)
+
+    def find_elements(self, by=By.ID, value=None):
+        """Find element matches inside the container, absolute XPath lookups are relative to
+        the container."""
+        if by == By.XPATH and value.startswith('/'):
+            value = '.' + value
+        return WebElement.find_elements(self, by, value)
+
+    def get_current_url(self):
+        """Returns the current location of the browser."""
+        return self.parent.current_url
@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from json import dump, load
+from os import environ
+from os.path import abspath, dirname, exists, join
+from threading import Thread
+from time import time
+from robot.api import logger
+from robot.libraries.BuiltIn import BuiltIn
+from selenium import webdriver
+try:
+    from BaseHTTPServer import HTTPServer
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+except ImportError:  # pragma: no cover
+    from http.server import HTTPServer, SimpleHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+
+
+class PerformanceLibrary(object):
+    """PerformanceLibrary serves the HTML fixtures and generated large pages from a local HTTP
+    server, opens headless browsers and records the latency of the measured keywords."""
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    ANGULAR_SCRIPT = '<script src="http://ajax.googleapis.com/ajax/libs/angularjs/' \
+                     '1.2.8/angular.min.js"></script>'
+    HTML_DIRECTORY = join(dirname(abspath(__file__)), '..', 'html')
+
+    def __init__(self, iterations=5, baseline=None, tolerance=0.5):
+        self._baseline = baseline
+        self._iterations = int(iterations)
+        self._results = {}
+        self._server = None
+        self._tolerance = float(tolerance)
+
+    def get_fixture_url(self, path):
+        """Returns the URL of the fixture ``path`` on the running fixture server, generated
+        pages are ``bindings.html``, ``form.html`` and ``select.html`` with a ``count``
+        query parameter."""
+        return 'http://%s:%d/%s' % (self._server.server_address[0],
+                                    self._server.server_address[1], path.lstrip('/'))
+
+    def measure_keyword_latency(self, label, name, *args):
+        """Runs keyword ``name`` with ``args`` the configured number of iterations and records
+        its median latency in milliseconds under ``label``."""
+        durations = []
+        for _ in range(self._iterations):
+            start = time()
+            BuiltIn().run_keyword(name, *args)
+            durations.append((time() - start) * 1000.0)
+        durations.sort()
+        self._results[label] = durations[len(durations) // 2]
+        logger.info('%s: %.2fms' % (label, self._results[label]))
+        return self._results[label]
+
+    def open_headless_browser(self, url, browser='chrome'):
+        """Opens a headless Chrome or Firefox browser to ``url`` through
+        ExtendedSelenium2Library."""
+        library = BuiltIn().get_library_instance('ExtendedSelenium2Library')
+        if browser.lower() in ('ff', 'firefox'):
+            environ['MOZ_HEADLESS'] = '1'
+            index = library.create_webdriver('Firefox')
+        else:
+            options = webdriver.ChromeOptions()
+            options.add_argument('--headless')
+            options.add_argument('--disable-gpu')
+            index = library.create_webdriver('Chrome', chrome_options=options)
+        library.go_to(url)
+        library.wait_until_angular_ready()
+        return index
+
+    def save_latency_results(self, path):
+        """Saves the recorded latencies to ``path`` and warns about every latency above the
+        baseline file given on import by more than the tolerance."""
+        with open(path, 'w') as results_file:
+            dump(self._results, results_file, indent=2, sort_keys=True)
+        if not self._baseline or not exists(self._baseline):
+            return
+        with open(self._baseline) as baseline_file:
+            baseline = load(baseline_file)
+        for label in sorted(self._results):
+            if label in baseline and \
+                    self._results[label] > baseline[label] * (1 + self._tolerance):
+                logger.warn('%s: %.2fms latency, the baseline is %.2fms.' %
+                            (label, self._results[label], baseline[label]))
+
+    def start_fixture_server(self):
+        """Starts serving the HTML fixtures and generated pages, returns the server URL."""
+        self._server = _ThreadingHTTPServer(('127.0.0.1', 0), _FixtureRequestHandler)
+        self._server.library = self
+        thread = Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self.get_fixture_url('')
+
+    def stop_fixture_server(self):
+        """Stops serving the HTML fixtures."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _get_bindings_page(self, count):
+        """Returns an AngularJS page with ``count`` bindings."""
+        return '<!DOCTYPE html><html><head><title>%(count)d Bindings</title>%(script)s' \
+               '<script>angular.module("module",[]).controller("controller",' \
+               '["$scope",function(s){s.items=[];for(var i=0;i<%(count)d;i++){' \
+               's.items.push({id:i,name:"Item "+i})}}]);</script></head>' \
+               '<body ng-app="module" ng-controller="controller"><ul>' \
+               '<li ng-repeat="item in items"><span id="item-{{item.id}}" ' \
+               'ng-bind="item.name"></span></li></ul></body></html>' % \
+               {'count': count, 'script': self.ANGULAR_SCRIPT}
+
+    @staticmethod
+    def _get_form_page(count):
+        """Returns a page with a form of ``count`` text inputs and checkboxes."""
+        fields = ''.join('<input type="text" name="text%d" value="%d"/>'
+                         '<input type="checkbox" name="check%d" value="%d"/>' %
+                         (index, index, index, index) for index in range(count // 2))
+        return '<!DOCTYPE html><html><head><title>%d Fields</title></head><body>' \
+               '<form id="form">%s</form></body></html>' % (count, fields)
+
+    @staticmethod
+    def _get_select_page(count):
+        """Returns a page with a single and a multiple select list of ``count`` options."""
+        options = ''.join('<option value="%d">Option %d</option>' % (index, index)
+                          for index in range(count))
+        return '<!DOCTYPE html><html><head><title>%d Options</title></head><body>' \
+               '<select id="single">%s</select><select id="multiple" multiple="multiple">' \
+               '%s</select></body></html>' % (count, options, options)
+
+
+class _FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the HTML fixtures directory and the generated pages."""
+
+    GENERATED_PAGES = {
+        '/bindings.html': ('_get_bindings_page', 10000),
+        '/form.html': ('_get_form_page', 500),
+        '/select.html': ('_get_select_page', 5000),
+    }
+
+    # pylint: disable=invalid-name
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path not in self.GENERATED_PAGES:
+            SimpleHTTPRequestHandler.do_GET(self)
+            return
+        method, count = self.GENERATED_PAGES[url.path]
+        count = int(parse_qs(url.query).get('count', [count])[0])
+        content = getattr(self.server.library, method)(count).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html;charset=UTF-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        pass
+
+    def translate_path(self, path):
+        relative = SimpleHTTPRequestHandler.translate_path(self, path)
+        return join(PerformanceLibrary.HTML_DIRECTORY,
+                    relative[len(SimpleHTTPRequestHandler.translate_path(self, '/')):])
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """HTTP server which handles every request in its own thread."""
+
+    daemon_threads = True
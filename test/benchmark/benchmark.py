@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from argparse import ArgumentParser
+from json import dump, load
+from os.path import abspath, dirname, join
+from subprocess import check_output
+from sys import executable, exit as sys_exit, path
+from time import time
+path.append(join(dirname(abspath(__file__)), '..', '..', 'src'))
+path.append(join(dirname(abspath(__file__)), '..', 'utest'))
+# pylint: disable=wrong-import-position
+from ExtendedSelenium2Library import ExtendedSelenium2Library
+from fakewebdriver import FakeWebDriver
+
+# the library import time on top of its dependencies, measured in a fresh interpreter
+IMPORT_LABEL = 'Import Library'
+IMPORT_SCRIPT = 'import sys;sys.path.insert(0,%r);import Selenium2Library;' \
+                'from time import time;start=time();import ExtendedSelenium2Library;' \
+                'print(time()-start)'
+# keyword label, keyword name and its arguments against the fake WebDriver
+KEYWORDS = [
+    ('Click Button', 'click_button', ('css=button#submit',)),
+    ('Click Element', 'click_element', ('css=div#target',)),
+    ('Get Location', 'get_location', ()),
+    ('Get Webelement By Binding', 'get_webelement', ('binding=user.name',)),
+    ('Get Webelement By Button', 'get_webelement', ('button=Submit',)),
+    ('Get Webelement By Model', 'get_webelement', ('model=user.name',)),
+    ('Get Webelement In Container', 'get_webelement', ('css=form#user >> button=Submit',)),
+    ('Input Text', 'input_text', ('css=input#name', 'text')),
+    ('Input Text Directly', 'input_text', ('css=input#name', 'text', False, True)),
+    ('Select Checkbox', 'select_checkbox', ('css=input#agree',)),
+    ('Select From List', 'select_from_list', ('css=select#list', '1')),
+    ('Select From List By Value', 'select_from_list_by_value', ('css=select#list', '1')),
+    ('Wait Until Element Contains Attribute', 'wait_until_element_contains_attribute',
+     ('css=div#target@class', 'ready')),
+    ('Wait Until Element Is Visible', 'wait_until_element_is_visible', ('css=div#target',)),
+    ('Wait Until Location Contains', 'wait_until_location_contains', ('fake',)),
+    ('Wait Until Page Contains Element', 'wait_until_page_contains_element',
+     ('css=div#target',)),
+]
+
+
+def measure_import(iterations):
+    """Returns the fastest library import time in milliseconds out of ``iterations``
+    fresh interpreters, as a result without any WebDriver commands."""
+    source = join(dirname(abspath(__file__)), '..', '..', 'src')
+    elapsed = min(float(check_output([executable, '-c', IMPORT_SCRIPT % source]).strip())
+                  for _ in range(max(iterations, 1)))
+    return {'commands': 0.0, 'overhead': elapsed * 1000.0, 'details': {}}
+
+
+def run(keywords, iterations, latency, breath_delay):
+    """Runs every keyword ``iterations`` times against the fake WebDriver, returns the
+    WebDriver commands and the library overhead in milliseconds per keyword call."""
+    fake = FakeWebDriver(latency).start()
+    library = ExtendedSelenium2Library(browser_breath_delay=breath_delay,
+                                       run_on_failure='Nothing')
+    fake.add_library_script_responses(library)
+    results = {}
+    try:
+        library.open_browser('http://fake/index.html', 'chrome', remote_url=fake.url)
+        for label, name, args in keywords:
+            keyword = getattr(library, name)
+            # warm up caches the way a real suite would
+            keyword(*args)
+            fake.reset_counts()
+            start = time()
+            for _ in range(iterations):
+                keyword(*args)
+            elapsed = time() - start
+            commands = fake.total_count()
+            results[label] = {
+                'commands': float(commands) / iterations,
+                'overhead': (elapsed - commands * latency) * 1000.0 / iterations,
+                'details': dict((command, float(count) / iterations)
+                                for command, count in fake.counts.items())
+            }
+        library.close_all_browsers()
+    finally:
+        fake.stop()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the regressions of ``results`` compared with the ``baseline``."""
+    regressions = []
+    for label in sorted(results):
+        if label not in baseline:
+            continue
+        if results[label]['commands'] > baseline[label]['commands']:
+            regressions.append('%s: %.1f commands, the baseline is %.1f.' %
+                               (label, results[label]['commands'],
+                                baseline[label]['commands']))
+        if results[label]['overhead'] > baseline[label]['overhead'] * (1 + tolerance):
+            regressions.append('%s: %.2fms overhead, the baseline is %.2fms.' %
+                               (label, results[label]['overhead'],
+                                baseline[label]['overhead']))
+    return regressions
+
+
+def main():
+    """Runs the benchmark from the command line."""
+    parser = ArgumentParser(description='Measures the WebDriver commands and the library '
+                                        'overhead per keyword against a fake WebDriver.')
+    parser.add_argument('-n', '--iterations', default=20, type=int,
+                        help='keyword calls to measure (default 20)')
+    parser.add_argument('-l', '--latency', default=0.0, type=float,
+                        help='latency per WebDriver command in milliseconds (default 0)')
+    parser.add_argument('-d', '--breath-delay', default=0.0, type=float,
+                        help='browser_breath_delay import argument (default 0)')
+    parser.add_argument('-k', '--keyword', action='append',
+                        help='only runs the keywords which label contains this value')
+    parser.add_argument('-s', '--save', help='saves the results as a baseline file')
+    parser.add_argument('-b', '--baseline', help='fails on regressions against a baseline file')
+    parser.add_argument('-t', '--tolerance', default=0.5, type=float,
+                        help='allowed overhead increase against the baseline (default 0.5)')
+    options = parser.parse_args()
+    keywords = [keyword for keyword in KEYWORDS
+                if not options.keyword or any(value.lower() in keyword[0].lower()
+                                              for value in options.keyword)]
+    results = run(keywords, options.iterations, options.latency / 1000.0, options.breath_delay)
+    if not options.keyword or any(value.lower() in IMPORT_LABEL.lower()
+                                  for value in options.keyword):
+        results[IMPORT_LABEL] = measure_import(min(options.iterations, 5))
+    print('%-40s %10s %14s' % ('Keyword', 'Commands', 'Overhead (ms)'))
+    for label in sorted(results):
+        print('%-40s %10.1f %14.2f' % (label, results[label]['commands'],
+                                       results[label]['overhead']))
+    if options.save:
+        with open(options.save, 'w') as baseline_file:
+            dump(results, baseline_file, indent=2, sort_keys=True)
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            regressions = compare(results, load(baseline_file), options.tolerance)
+        for regression in regressions:
+            print(regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys_exit(main())
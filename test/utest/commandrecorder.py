@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from fakewebdriver import ScriptResponder
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class CommandRecorder(ScriptResponder):
+    """CommandRecorder is a WebDriver command executor which records every command it receives
+    and answers them without a browser, scripts are answered by the registered script
+    responses."""
+
+    def __init__(self, browser_name='chrome'):
+        super(CommandRecorder, self).__init__()
+        self.commands = []
+        self._responses = {
+            Command.EXECUTE_ASYNC_SCRIPT: True,
+            Command.FIND_CHILD_ELEMENT: {'ELEMENT': 'element'},
+            Command.FIND_CHILD_ELEMENTS: [{'ELEMENT': 'element'}],
+            Command.FIND_ELEMENT: {'ELEMENT': 'element'},
+            Command.FIND_ELEMENTS: [{'ELEMENT': 'element'}],
+            Command.GET_CURRENT_URL: lambda params: self.location,
+            Command.GET_ELEMENT_TAG_NAME: 'input',
+            Command.IS_ELEMENT_DISPLAYED: True,
+            Command.IS_ELEMENT_ENABLED: True,
+            Command.IS_ELEMENT_SELECTED: False,
+            Command.NEW_SESSION: {'browserName': browser_name, 'javascriptEnabled': True},
+        }
+
+    def create_driver(self):
+        """Returns a WebDriver which sends its commands to this recorder."""
+        driver = WebDriver(self, desired_capabilities={})
+        self.reset()
+        return driver
+
+    def execute(self, command, params):
+        """Records ``command`` and returns its response."""
+        self.commands.append(command)
+        response = self._responses.get(command)
+        if command in (Command.EXECUTE_SCRIPT, Command.EXECUTE_ASYNC_SCRIPT):
+            response = self.run_script(params['script'], params.get('args', []), response)
+        elif callable(response):
+            response = response(params)
+        return {'sessionId': 'session', 'status': 0, 'value': response}
+
+    def reset(self):
+        """Forgets all recorded commands."""
+        self.commands = []
+
+    def set_response(self, command, response):
+        """Answers every ``command`` with ``response``."""
+        self._responses[command] = response
+
+
+class CommandBudgetMixin(object):
+    """CommandBudgetMixin adds WebDriver command budget assertions to test cases."""
+
+    def assertCommandBudget(self, recorder, budget, keyword, *args, **kwargs):
+        # pylint: disable=invalid-name
+        """Fails when ``keyword`` sends more than ``budget`` commands to ``recorder``."""
+        recorder.reset()
+        keyword(*args, **kwargs)
+        if len(recorder.commands) > budget:
+            # pylint: disable=no-member
+            self.fail('%s sent %d WebDriver commands, the budget is %d: %s' %
+                      (keyword.__name__, len(recorder.commands), budget,
+                       ', '.join(recorder.commands)))
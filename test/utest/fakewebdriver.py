@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from json import dumps, loads
+from re import compile as re_compile
+from threading import Lock, Thread
+from time import sleep
+from uuid import uuid4
+from ExtendedSelenium2Library.locators import ExtendedElementFinder
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+def get_script_responses(library):
+    """Returns the fake answers of the library scripts, none of them need a real page."""
+    return [
+        (library.ATTRIBUTE_WATCHER, []),
+        (library.LOCATION_WATCHER, lambda fake, args: fake.location),
+        (library.SELECT_OPTIONS_SCRIPT, []),
+        (ExtendedElementFinder.BUTTON_TEXT_WRAPPER.split('%', 1)[0],
+         lambda fake, args: [fake.element('button#submit')]),
+        (ExtendedElementFinder.NG_BINDING_WRAPPER.split('%', 1)[0],
+         lambda fake, args: [fake.element('span.ng-binding')]),
+        (ExtendedElementFinder.NG_PREFIX_SCRIPT, ['ng-']),
+        ('cb(location.href)', lambda fake, args: fake.location),
+        # page ready and every other asynchronous script
+        ('arguments[arguments.length-1]', True),
+    ]
+
+
+class ScriptResponder(object):
+    """ScriptResponder is the browser behind the fake WebDrivers, it answers scripts with
+    the registered script responses and keeps the current location."""
+
+    def __init__(self):
+        self.location = 'about:blank'
+        self.script_responses = []
+
+    def add_script_response(self, marker, response):
+        """Answers any script that contains ``marker`` with ``response``,
+        which may be a callable of the fake and the script arguments.
+        The first registered marker found in a script wins."""
+        self.script_responses.append((marker, response))
+
+    def add_library_script_responses(self, library):
+        """Answers every script of ``library`` without a real page."""
+        for marker, response in get_script_responses(library):
+            self.add_script_response(marker, response)
+
+    def element(self, selector):
+        """Returns the WebDriver reference of the fake element for ``selector``, the same for
+        every selector."""
+        return {'ELEMENT': 'element'}
+
+    def run_script(self, script, args, default=None):
+        """Returns the registered response of ``script``, or ``default`` without one."""
+        for marker, response in self.script_responses:
+            if marker in script:
+                return response(self, args) if callable(response) else response
+        return default
+
+
+class FakeWebDriver(ScriptResponder):
+    """FakeWebDriver is a local stand-in WebDriver server with a configurable latency
+    per command, which counts every command it receives. It has no browser behind it,
+    scripts are answered by the registered script responses."""
+
+    ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+    SELECTOR_ATTRIBUTE = re_compile(r'\[([\w-]+)=["\']?([^"\'\]]*)["\']?\]')
+    SELECTOR_TAG = re_compile(r'^([a-zA-Z][\w-]*)')
+
+    def __init__(self, latency=0.0, browser_name='chrome', host='127.0.0.1', port=0):
+        super(FakeWebDriver, self).__init__()
+        self.browser_name = browser_name
+        self.counts = {}
+        self.latency = latency
+        self.session_id = uuid4().hex
+        self._elements = {}
+        self._lock = Lock()
+        self._routes = [(method, re_compile('^/session/[^/]+%s$' % path), handler)
+                        for method, path, handler in self._get_routes()]
+        self._server = _ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """Returns the remote URL of the fake WebDriver server."""
+        return 'http://%s:%d/wd/hub' % self._server.server_address
+
+    def element(self, selector):
+        """Returns the WebDriver reference of the fake element for ``selector``."""
+        with self._lock:
+            element_id = self._elements.setdefault(selector, {'id': 'e%d' % len(self._elements),
+                                                              'selector': selector})['id']
+        return {'ELEMENT': element_id, self.ELEMENT_KEY: element_id}
+
+    def reset_counts(self):
+        """Resets all command counts."""
+        with self._lock:
+            self.counts = {}
+
+    def start(self):
+        """Starts serving WebDriver commands in a background thread."""
+        self._thread = Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving WebDriver commands."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def total_count(self):
+        """Returns the number of commands received since the last reset."""
+        with self._lock:
+            return sum(self.counts.values())
+
+    def handle(self, method, path, body):
+        """Returns the response value of a WebDriver command."""
+        path = path.split('/wd/hub', 1)[-1].rstrip('/')
+        if method == 'POST' and path == '/session':
+            return self._count('newSession', {'browserName': self.browser_name,
+                                              'javascriptEnabled': True})
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if route_method == method and match:
+                return self._count(handler.__name__.lstrip('_'), handler(body, *match.groups()))
+        return self._count('%s %s' % (method, path.split('/', 3)[-1]), None)
+
+    def _count(self, command, value):
+        """Counts the command and waits for the configured latency."""
+        with self._lock:
+            self.counts[command] = self.counts.get(command, 0) + 1
+        if self.latency:
+            sleep(self.latency)
+        return value
+
+    def _get_element(self, element_id):
+        """Returns the fake element with the given ``element_id``."""
+        with self._lock:
+            for element in self._elements.values():
+                if element['id'] == element_id:
+                    return element
+        return {'id': element_id, 'selector': ''}
+
+    def _get_routes(self):
+        """Returns the supported WebDriver commands, in both JSON Wire and W3C flavors."""
+        return [
+            ('DELETE', '', self._quit),
+            ('GET', '/url', self._get_url),
+            ('POST', '/url', self._navigate),
+            ('GET', '/title', self._get_title),
+            ('GET', '/window_handles?', self._get_window_handles),
+            ('GET', '/window/handles', self._get_window_handles),
+            ('POST', '/element', self._find_element),
+            ('POST', '/elements', self._find_elements),
+            ('POST', '/element/([^/]+)/element', self._find_child_element),
+            ('POST', '/element/([^/]+)/elements', self._find_child_elements),
+            ('POST', '/execute(?:/sync)?', self._execute_script),
+            ('POST', '/execute_async', self._execute_async_script),
+            ('POST', '/execute/async', self._execute_async_script),
+            ('POST', '/element/([^/]+)/click', self._click_element),
+            ('POST', '/element/([^/]+)/clear', self._clear_element),
+            ('POST', '/element/([^/]+)/value', self._send_keys_to_element),
+            ('GET', '/element/([^/]+)/name', self._get_element_tag_name),
+            ('GET', '/element/([^/]+)/attribute/([^/]+)', self._get_element_attribute),
+            ('GET', '/element/([^/]+)/property/([^/]+)', self._get_element_attribute),
+            ('GET', '/element/([^/]+)/selected', self._is_element_selected),
+            ('GET', '/element/([^/]+)/enabled', self._is_element_enabled),
+            ('GET', '/element/([^/]+)/displayed', self._is_element_displayed),
+            ('GET', '/element/([^/]+)/text', self._get_element_text),
+            ('POST', '/log', self._get_log),
+            ('POST', '/timeouts(?:/[^/]+)?', self._set_timeouts),
+        ]
+
+    # pylint: disable=missing-docstring,unused-argument
+    def _clear_element(self, body, element_id):
+        return None
+
+    def _click_element(self, body, element_id):
+        return None
+
+    def _execute_async_script(self, body):
+        return self.run_script(body.get('script', ''), body.get('args', []))
+
+    def _execute_script(self, body):
+        return self.run_script(body.get('script', ''), body.get('args', []))
+
+    def _find_child_element(self, body, element_id):
+        return self.element('%s %s' % (self._get_element(element_id)['selector'], body['value']))
+
+    def _find_child_elements(self, body, element_id):
+        return [self._find_child_element(body, element_id)]
+
+    def _find_element(self, body):
+        return self.element(body['value'])
+
+    def _find_elements(self, body):
+        return [self.element(body['value'])]
+
+    def _get_element_attribute(self, body, element_id, name):
+        attributes = dict(self.SELECTOR_ATTRIBUTE.findall(self._get_element(element_id)
+                                                          ['selector']))
+        return attributes.get(name)
+
+    def _get_element_tag_name(self, body, element_id):
+        match = self.SELECTOR_TAG.match(self._get_element(element_id)['selector'])
+        return match.group(1).lower() if match else 'div'
+
+    def _get_element_text(self, body, element_id):
+        return self._get_element(element_id)['selector']
+
+    def _get_log(self, body):
+        return []
+
+    def _get_title(self, body):
+        return 'Fake WebDriver'
+
+    def _get_url(self, body):
+        return self.location
+
+    def _get_window_handles(self, body):
+        return ['window']
+
+    def _is_element_displayed(self, body, element_id):
+        return True
+
+    def _is_element_enabled(self, body, element_id):
+        return True
+
+    def _is_element_selected(self, body, element_id):
+        return False
+
+    def _navigate(self, body):
+        self.location = body['url']
+
+    def _quit(self, body):
+        return None
+
+    def _send_keys_to_element(self, body, element_id):
+        return None
+
+    def _set_timeouts(self, body):
+        return None
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """Multi-threaded HTTP server."""
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Translates HTTP requests into fake WebDriver commands."""
+
+    # pylint: disable=invalid-name
+    def do_DELETE(self):
+        self._respond('DELETE')
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, method):
+        """Writes the JSON Wire protocol response of the requested command."""
+        length = int(self.headers.get('Content-Length') or 0)
+        content = self.rfile.read(length) if length else b''
+        body = loads(content.decode('utf-8')) if content.strip() else {}
+        value = self.server.fake.handle(method, self.path, body)
+        parts = self.path.split('/wd/hub', 1)[-1].split('/')
+        session_id = parts[2] if len(parts) > 2 else self.server.fake.session_id
+        response = dumps({'sessionId': session_id, 'status': 0,
+                          'value': value}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from sys import path
+path.append('src')
+import unittest
+from commandrecorder import CommandBudgetMixin, CommandRecorder
+from ExtendedSelenium2Library import ExtendedSelenium2Library
+from selenium.webdriver.remote.command import Command
+
+
+class CommandBudgetTests(CommandBudgetMixin, unittest.TestCase):
+    """WebDriver command budget test class.
+
+    Every budget is the sum of the commands a keyword needs, from these building blocks:
+    - lookup: one findElements, plus one getElementTagName when the tag is checked.
+    - page ready after an action: the stale check, a findElement and an isElementEnabled on
+      the html element, then one executeAsyncScript.
+    - page ready without the stale check: one executeAsyncScript between two
+      setScriptTimeout commands, which set and restore the script timeout.
+    Raise a budget only when a keyword really needs another command.
+    """
+
+    def setUp(self):
+        """Instantiate the library with a command recorder browser."""
+        self.library = ExtendedSelenium2Library(browser_breath_delay=0,
+                                                run_on_failure='Nothing')
+        self.recorder = CommandRecorder()
+        # pylint: disable=protected-access
+        self.library._cache.register(self.recorder.create_driver(), None)
+        self.recorder.add_library_script_responses(self.library)
+
+    def test_should_record_commands(self):
+        """Should record every command sent to the browser."""
+        self.library.get_webelement('css=.selector')
+        self.assertEqual(self.recorder.commands, [Command.FIND_ELEMENTS])
+
+    def test_should_fail_over_budget(self):
+        """Should fail when a keyword exceeds its command budget."""
+        with self.assertRaises(AssertionError) as context:
+            self.assertCommandBudget(self.recorder, 0, self.library.get_webelement,
+                                     'css=.selector')
+        self.assertEqual(str(context.exception),
+                         'get_webelement sent 1 WebDriver commands, the budget is 0: '
+                         'findElements')
+
+    def test_should_click_button_within_budget(self):
+        """Should click a button within its command budget."""
+        self.recorder.set_response(Command.GET_ELEMENT_TAG_NAME, 'button')
+        # input lookup (2), button lookup (2), click (1), page ready after an action (3)
+        self.assertCommandBudget(self.recorder, 8, self.library.click_button, 'css=button')
+
+    def test_should_click_element_within_budget(self):
+        """Should click an element within its command budget."""
+        # lookup (1), click (1), page ready after an action (3)
+        self.assertCommandBudget(self.recorder, 5, self.library.click_element, 'css=.selector')
+
+    def test_should_click_link_within_budget(self):
+        """Should click a link within its command budget."""
+        self.recorder.set_response(Command.GET_ELEMENT_TAG_NAME, 'a')
+        # lookup with the tag check (2), click (1), page ready after an action (3)
+        self.assertCommandBudget(self.recorder, 6, self.library.click_link, 'css=a')
+
+    def test_should_find_element_by_binding_within_budget(self):
+        """Should find an element by binding within its command budget."""
+        # a single executeScript finds the bindings in the browser
+        self.assertCommandBudget(self.recorder, 1, self.library.get_webelement,
+                                 'binding=user.name')
+
+    def test_should_find_element_by_button_within_budget(self):
+        """Should find an element by button text within its command budget."""
+        # a single executeScript finds the buttons in the browser
+        self.assertCommandBudget(self.recorder, 1, self.library.get_webelement, 'button=Submit')
+
+    def test_should_find_element_by_model_within_budget(self):
+        """Should find an element by model within its command budget."""
+        # the ng prefixes used by the page are detected by an executeScript on the first
+        # lookup only (1), then a single findElements finds the model (1)
+        self.assertCommandBudget(self.recorder, 2, self.library.get_webelement,
+                                 'model=user.name')
+        self.assertCommandBudget(self.recorder, 1, self.library.get_webelement,
+                                 'model=user.name')
+
+    def test_should_find_elements_by_model_within_budget(self):
+        """Should find all elements by model within their command budget."""
+        # a single findElements finds the model with all ng prefixes (1)
+        self.assertCommandBudget(self.recorder, 1, self.library.get_webelements,
+                                 'model=user.name')
+
+    def test_should_get_location_within_budget(self):
+        """Should get the location within its command budget."""
+        # the location comes back from the page ready script without the stale check (3)
+        self.assertCommandBudget(self.recorder, 3, self.library.get_location)
+
+    def test_should_input_text_within_budget(self):
+        """Should input text within its command budget."""
+        # lookup (1), clear (1), send keys (1), page ready without the stale check (3)
+        self.assertCommandBudget(self.recorder, 6, self.library.input_text, 'css=input', 'text')
+
+    def test_should_input_text_directly_within_budget(self):
+        """Should input text directly within its command budget."""
+        # lookup (1), one executeScript sets the value, page ready without the stale check (3)
+        self.assertCommandBudget(self.recorder, 5, self.library.input_text, 'css=input', 'text',
+                                 direct_set=True)
+
+    def test_should_select_checkbox_within_budget(self):
+        """Should select a checkbox within its command budget."""
+        # lookup with the tag check (2), isElementSelected (1),
+        # page ready without the stale check (3)
+        self.assertCommandBudget(self.recorder, 6, self.library.select_checkbox, 'css=input')
+
+    def test_should_search_frame_text_inside_frame(self):
+        """Should search the text of Frame Should Contain inside the frame."""
+        self.library.frame_should_contain('frame=id=outer |> id=inner', 'text')
+        # frame lookup (1), switch into the frame (1), text lookup (1),
+        # switch back to the top frame (1)
+        self.assertEqual(self.recorder.commands[-4:], [Command.FIND_ELEMENTS,
+                                                       Command.SWITCH_TO_FRAME,
+                                                       Command.FIND_ELEMENTS,
+                                                       Command.SWITCH_TO_FRAME])
+
+    def test_should_select_frame_again_after_get_window_titles(self):
+        """Should select the frame chain again after Get Window Titles left it."""
+        self.recorder.set_response(Command.GET_CURRENT_WINDOW_HANDLE, 'main')
+        self.recorder.set_response(Command.GET_WINDOW_HANDLES, ['main'])
+        self.recorder.add_script_response('return [ window.id, window.name, document.title',
+                                          ['main', 'main', 'Title', 'url'])
+        self.library.get_webelement('frame=id=outer |> css=.selector')
+        self.library.get_window_titles()
+        self.recorder.reset()
+        self.library.get_webelement('frame=id=outer |> css=.selector')
+        self.assertIn(Command.SWITCH_TO_FRAME, self.recorder.commands)
+
+    def test_should_select_frame_again_after_select_window(self):
+        """Should select the frame chain again after Select Window left it."""
+        self.recorder.set_response(Command.GET_CURRENT_WINDOW_HANDLE, 'main')
+        self.recorder.set_response(Command.GET_WINDOW_HANDLES, ['main'])
+        self.library.get_webelement('frame=id=outer |> css=.selector')
+        self.library.select_window('main')
+        self.recorder.reset()
+        self.library.get_webelement('frame=id=outer |> css=.selector')
+        self.assertIn(Command.SWITCH_TO_FRAME, self.recorder.commands)
+
+    def test_should_select_from_list_within_budget(self):
+        """Should select from a list within its command budget."""
+        self.recorder.set_response(Command.GET_ELEMENT_TAG_NAME, 'select')
+        # lookup with the tag check (2), one executeScript selects the options,
+        # page ready without the stale check (3)
+        self.assertCommandBudget(self.recorder, 6, self.library.select_from_list_by_value,
+                                 'css=select', 'value')
+
+    def test_should_wait_until_element_contains_attribute_within_budget(self):
+        """Should wait until an element contains an attribute within its command budget."""
+        # lookup (1), the attribute watcher runs as the page ready script without
+        # the stale check (3)
+        self.assertCommandBudget(self.recorder, 4,
+                                 self.library.wait_until_element_contains_attribute,
+                                 'css=.selector@class', 'value')
+
+    def test_should_wait_until_element_is_visible_within_budget(self):
+        """Should wait until an element is visible within its command budget."""
+        # lookup (1), isElementDisplayed (1) on the first poll
+        self.assertCommandBudget(self.recorder, 2, self.library.wait_until_element_is_visible,
+                                 'css=.selector')
+
+    def test_should_wait_until_location_contains_within_budget(self):
+        """Should wait until the location contains a value within its command budget."""
+        # the location watcher runs as the page ready script without the stale check (3)
+        self.assertCommandBudget(self.recorder, 3, self.library.wait_until_location_contains,
+                                 'blank')
+
+    def test_should_wait_until_page_contains_element_within_budget(self):
+        """Should wait until the page contains an element within its command budget."""
+        # lookup (1) on the first poll
+        self.assertCommandBudget(self.recorder, 1,
+                                 self.library.wait_until_page_contains_element, 'css=.selector')
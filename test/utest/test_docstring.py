@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from sys import path
+path.append('src')
+import unittest
+from ExtendedSelenium2Library.decorators import inherit_docs
+
+
+class Parent(object):
+    """Parent class with documented methods."""
+
+    def documented(self):
+        """Parent documentation."""
+
+    def overridden(self):
+        """Overridden documentation."""
+
+
+class Child(Parent):
+    """Child class without its own methods."""
+
+
+class InheritDocsTests(unittest.TestCase):
+    """Inherit docs decorator test class."""
+
+    def test_should_inherit_docs_from_ancestors(self):
+        """Should inherit method docstring from the nearest documented ancestor."""
+        @inherit_docs
+        class GrandChild(Child):
+            """Grand child class with undocumented methods."""
+            # pylint: disable=missing-docstring
+            def documented(self):
+                pass
+
+            def undocumented(self):
+                pass
+        self.assertEqual(GrandChild.documented.__doc__, 'Parent documentation.')
+        self.assertIsNone(GrandChild.undocumented.__doc__)
+
+    def test_should_keep_own_docs(self):
+        """Should keep method docstring that is already documented."""
+        @inherit_docs
+        class GrandChild(Child):
+            """Grand child class with documented methods."""
+            def overridden(self):
+                """Own documentation."""
+        self.assertEqual(GrandChild.overridden.__doc__, 'Own documentation.')
+
+    def test_should_skip_non_methods(self):
+        """Should leave class attributes that are not methods untouched."""
+        @inherit_docs
+        class GrandChild(Child):
+            """Grand child class with class attributes."""
+            documented = 'value'
+        self.assertEqual(GrandChild.documented, 'value')
@@ -306,6 +306,21 @@ class ExtendedElementTests(unittest.TestCase):
         self.assertFalse(self.element.is_element_visible(self.locator))
         self.element._is_visible.assert_called_with(self.locator)
 
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedelement.logger")
+    def test_log_locator_statistics(self, mock_logger):
+        """Should log the ranked locator statistics up to the limit."""
+        statistics = [{'locator': 'button=Save', 'lookups': 2, 'matches': 1, 'max_time': 0.5,
+                       'retries': 1, 'strategy': 'button', 'time': 0.75},
+                      {'locator': self.locator, 'lookups': 1, 'matches': 3, 'max_time': 0.25,
+                       'retries': 0, 'strategy': 'css', 'time': 0.25}]
+        # pylint: disable=protected-access
+        self.element._element_finder.get_statistics = mock.Mock(return_value=statistics)
+        self.assertEqual(self.element.log_locator_statistics('1'), statistics)
+        report = mock_logger.info.call_args[0][0].splitlines()
+        self.assertEqual(len(report), 2)
+        self.assertEqual(report[1].split(), ['1', '0.750', '2', '0.375', '0.500', '1', '1',
+                                             'button', 'button=Save'])
+
     @mock.patch("ExtendedSelenium2Library.keywords.extendedelement.logger")
     def test_scroll_element_into_view(self, mock_logger):
         """Scroll element into view."""
@@ -368,6 +383,44 @@ class ExtendedElementTests(unittest.TestCase):
         self.element._is_internet_explorer.assert_called_with()
         self.assertFalse(self.element.scroll_element_into_view.called)
 
+    def test_should_find_first_element_only(self):
+        """Should find the first element with the element finder stopping at the first match."""
+        # pylint: disable=protected-access
+        self.element._element_finder = mock.Mock()
+        self.element._element_finder.find.return_value = [self.web_element]
+        self.assertEqual(self.element._element_find(self.locator, True, True), self.web_element)
+        self.element._element_finder.find.assert_called_with(
+            self.element._current_browser.return_value, self.locator, None, True)
+
+    def test_should_find_all_elements(self):
+        """Should find all elements."""
+        # pylint: disable=protected-access
+        self.element._element_finder = mock.Mock()
+        self.element._element_finder.find.return_value = [self.web_element]
+        self.assertEqual(self.element._element_find(self.locator, False, True, 'a'),
+                         [self.web_element])
+        self.element._element_finder.find.assert_called_with(
+            self.element._current_browser.return_value, self.locator, 'a', False)
+
+    def test_should_find_element_from_web_element(self):
+        """Should return the given web element."""
+        # pylint: disable=protected-access
+        self.element._element_finder = mock.Mock()
+        self.assertEqual(self.element._element_find(self.web_element, True, True),
+                         self.web_element)
+        self.assertFalse(self.element._element_finder.find.called)
+
+    def test_should_not_find_required_element(self):
+        """Should fail when a required element is not found."""
+        # pylint: disable=protected-access
+        self.element._element_finder = mock.Mock()
+        self.element._element_finder.find.return_value = []
+        self.assertIsNone(self.element._element_find(self.locator, True, False))
+        with self.assertRaises(ValueError) as context:
+            self.element._element_find(self.locator, True, True)
+        self.assertEqual(str(context.exception),
+                         "Element locator '%s' did not match any elements." % self.locator)
+
     def test_is_internet_explorer(self):
         """Browser name should be internet explorer."""
         # pylint: disable=protected-access
@@ -26,6 +26,8 @@ path.append('src')
 import unittest
 import mock
 from ExtendedSelenium2Library.locators import ExtendedElementFinder
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.command import Command
 from selenium.webdriver.remote.webelement import WebElement
 from Selenium2Library.locators import ElementFinder
 
@@ -36,10 +38,10 @@ class ExtendedElementFinderTests(unittest.TestCase):
     def setUp(self):
         """Instantiate the extended element finder class."""
         self.default_strategies = ['binding', 'button', 'css', 'default', 'dom',
-                                   'id', 'identifier', 'jquery', 'link', 'model',
-                                   'name', 'options', 'partial binding',
-                                   'partial button', 'partial link', 'scLocator',
-                                   'sizzle', 'tag', 'xpath']
+                                   'exact repeater', 'frame', 'id', 'identifier', 'jquery',
+                                   'link', 'model', 'name', 'options', 'partial binding',
+                                   'partial button', 'partial link', 'repeater', 'scLocator',
+                                   'shadow', 'sizzle', 'tag', 'xpath']
         self.driver = mock.Mock()
         self.driver.session_id = 'session'
         self.finder = ExtendedElementFinder()
@@ -69,9 +71,9 @@ class ExtendedElementFinderTests(unittest.TestCase):
                  button_text
         tag = 'tag'
         self.finder._find_by_button_text(self.driver, button_text, tag, constrains)
-        self.driver.execute_script.assert_called_with(script)
-        self.finder._filter_elements.assert_called_with(self.driver.execute_script.return_value,
-                                                        tag, constrains)
+        self.driver.execute_script.assert_called_with(script, None, {'constraints': constrains,
+                                                                     'first': False, 'tag': tag})
+        self.assertFalse(self.finder._filter_elements.called)
 
     def test_should_find_by_button_text_partial(self):
         """Should find by button partial text."""
@@ -81,9 +83,200 @@ class ExtendedElementFinderTests(unittest.TestCase):
                  button_text
         tag = 'tag'
         self.finder._find_by_button_text_partial(self.driver, button_text, tag, constrains)
-        self.driver.execute_script.assert_called_with(script)
-        self.finder._filter_elements.assert_called_with(self.driver.execute_script.return_value,
-                                                        tag, constrains)
+        self.driver.execute_script.assert_called_with(script, None, {'constraints': constrains,
+                                                                     'first': False, 'tag': tag})
+        self.assertFalse(self.finder._filter_elements.called)
+
+    def test_should_find_inside_container(self):
+        """Should find inside the container element."""
+        self.driver.execute.return_value = {'value': []}
+        self.finder._filter_elements.return_value = [self.web_element]
+        elements = self.finder.find(self.driver, 'css=#grid >> css=.cell')
+        self.assertEqual(elements, [self.web_element])
+        self.driver.find_elements_by_css_selector.assert_called_once_with('#grid')
+        self.driver.execute.assert_called_once_with(Command.FIND_CHILD_ELEMENTS,
+                                                    {'using': 'css selector', 'value': '.cell',
+                                                     'id': 'element'})
+
+    def test_should_find_inside_container_by_xpath(self):
+        """Should keep absolute XPath lookups inside the container element."""
+        self.driver.execute.return_value = {'value': []}
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'id=grid >> xpath=//td')
+        self.driver.execute.assert_called_once_with(Command.FIND_CHILD_ELEMENTS,
+                                                    {'using': 'xpath', 'value': './/td',
+                                                     'id': 'element'})
+
+    def test_should_find_inside_container_by_script(self):
+        """Should find inside the container element with a finder script."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.driver.execute_script.return_value = [self.web_element]
+        elements = self.finder.find(self.driver, 'css=#grid >> button=Save', 'button')
+        self.assertEqual(elements, [self.web_element])
+        arguments = self.driver.execute_script.call_args[0]
+        self.assertEqual(arguments[1].id, 'element')
+        self.assertEqual(arguments[2], {'constraints': {}, 'first': False, 'tag': 'button'})
+
+    def test_should_not_split_locator_without_strategy_prefix(self):
+        """Should only split the locator before a locator with a known strategy prefix."""
+        self.driver.execute.return_value = {'value': []}
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'css=a[title="a >> b"] >> css=.icon')
+        self.driver.find_elements_by_css_selector.assert_called_once_with('a[title="a >> b"]')
+
+    def test_should_not_find_by_page_script_inside_container(self):
+        """Should fail to find with the strategies of the whole page inside a container."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        for locator in ('dom=document.forms[0]', 'jquery=.cell', 'scLocator=//Grid',
+                        'sc locator=//Grid', 'sizzle=.cell'):
+            with self.assertRaises(ValueError):
+                self.finder.find(self.driver, 'css=#grid >> %s' % locator)
+        self.assertFalse(self.driver.execute_script.called)
+
+    def test_should_find_first_only(self):
+        """Should stop the finder script at the first match."""
+        self.driver.execute_script.return_value = [self.web_element]
+        self.assertEqual(self.finder.find(self.driver, 'button=Save', first_only=True),
+                         [self.web_element])
+        self.assertEqual(self.driver.execute_script.call_args[0][2],
+                         {'constraints': {}, 'first': True, 'tag': None})
+        self.finder.find(self.driver, 'button=Save')
+        self.assertEqual(self.driver.execute_script.call_args[0][2],
+                         {'constraints': {}, 'first': False, 'tag': None})
+
+    def test_should_find_first_only_inside_frame(self):
+        """Should stop the finder script inside the frame chain at the first match."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.driver.execute_script.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> button=Save', first_only=True)
+        self.assertEqual(self.driver.execute_script.call_args[0][2],
+                         {'constraints': {}, 'first': True, 'tag': None})
+
+    def test_should_find_first_container_only(self):
+        """Should stop the finder script of the containers at the first match."""
+        self.driver.execute.return_value = {'value': []}
+        self.driver.execute_script.return_value = [self.web_element]
+        self.finder._filter_elements.return_value = []
+        self.finder.find(self.driver, 'button=Save >> css=.icon')
+        self.assertEqual(self.driver.execute_script.call_args[0][2],
+                         {'constraints': {}, 'first': True, 'tag': None})
+
+    def test_should_not_find_without_container(self):
+        """Should not find any element when the container does not exist."""
+        self.finder._filter_elements.return_value = []
+        self.assertEqual(self.finder.find(self.driver, 'css=#grid >> css=.cell'), [])
+        self.driver.find_elements_by_css_selector.assert_called_once_with('#grid')
+
+    def test_should_find_by_frame(self):
+        """Should find inside the nested frames of the frame chain."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        elements = self.finder.find(self.driver, 'frame=id=outer |> id=inner |> id=target')
+        self.assertEqual(elements, [self.web_element])
+        self.driver.switch_to_default_content.assert_called_once_with()
+        self.assertEqual(self.driver.switch_to_frame.call_args_list,
+                         [mock.call(self.web_element), mock.call(self.web_element)])
+        self.assertEqual(self.driver.find_elements_by_id.call_args_list,
+                         [mock.call('outer'), mock.call('inner'), mock.call('target')])
+
+    def test_should_find_by_frame_without_switching_frames(self):
+        """Should not switch frames when the frame chain is already selected."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.find(self.driver, 'frame=id=outer |> id=another')
+        self.assertEqual(self.driver.switch_to_default_content.call_count, 1)
+        self.assertEqual(self.driver.switch_to_frame.call_count, 1)
+        self.driver.find_elements_by_id.assert_called_with('another')
+
+    def test_should_find_by_frame_with_cached_frames(self):
+        """Should reuse the frame elements of the current document."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.find(self.driver, 'id=top')
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.assertEqual(self.driver.switch_to_default_content.call_count, 3)
+        self.assertEqual(self.driver.switch_to_frame.call_count, 2)
+        self.assertEqual(self.driver.find_elements_by_id.call_args_list,
+                         [mock.call('outer'), mock.call('target'), mock.call('top'),
+                          mock.call('target')])
+
+    def test_should_find_by_frame_with_stale_frames(self):
+        """Should find the frame elements again when the document has changed."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.find(self.driver, 'id=top')
+        self.driver.switch_to_frame.side_effect = [StaleElementReferenceException(), None]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.assertEqual(self.driver.switch_to_frame.call_count, 3)
+        self.assertEqual(self.driver.find_elements_by_id.call_args_list,
+                         [mock.call('outer'), mock.call('target'), mock.call('top'),
+                          mock.call('outer'), mock.call('target')])
+
+    def test_should_find_by_frame_again_without_matches(self):
+        """Should select the frame chain again when the selected frame has no matches."""
+        self.finder._filter_elements.side_effect = [[self.web_element], [self.web_element],
+                                                    [], [self.web_element]]
+        elements = self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        elements = self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.assertEqual(elements, [self.web_element])
+        self.assertEqual(self.driver.switch_to_default_content.call_count, 2)
+
+    def test_should_not_find_by_frame_without_frame(self):
+        """Should not find any element when a frame of the frame chain does not exist."""
+        self.finder._filter_elements.return_value = []
+        self.assertEqual(self.finder.find(self.driver, 'frame=id=outer |> id=target'), [])
+        self.driver.find_elements_by_id.assert_called_once_with('outer')
+        self.assertFalse(self.driver.switch_to_frame.called)
+
+    def test_should_not_switch_to_unknown_frame(self):
+        """Should keep the frame selected outside the element finder."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.set_frame_path(self.driver)
+        self.finder.find(self.driver, 'id=top')
+        self.assertEqual(self.driver.switch_to_default_content.call_count, 1)
+
+    def test_should_not_find_by_frame_inside_container(self):
+        """Should fail to find by frame inside a container."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        with self.assertRaises(ValueError):
+            self.finder.find(self.driver, 'css=#grid >> frame=id=outer |> id=target')
+        self.assertFalse(self.driver.switch_to_frame.called)
+
+    def test_should_forget_cached_frames_of_changed_document(self):
+        """Should find the frame elements again when the document has changed."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'id=top')
+        self.finder.set_document(self.driver, 'html')
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.find(self.driver, 'id=top')
+        self.finder.set_document(self.driver, 'html')
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.find(self.driver, 'id=top')
+        self.finder.set_document(self.driver, 'another html')
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.assertEqual(self.driver.find_elements_by_id.call_args_list,
+                         [mock.call('top'), mock.call('outer'), mock.call('target'),
+                          mock.call('top'), mock.call('target'), mock.call('top'),
+                          mock.call('outer'), mock.call('target')])
+
+    def test_should_forget_cached_frames_of_selected_frame(self):
+        """Should find the frame elements again when a frame is selected outside."""
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.finder.set_frame_path(self.driver, ())
+        self.finder.find(self.driver, 'frame=id=outer |> id=target')
+        self.assertEqual(self.driver.find_elements_by_id.call_args_list,
+                         [mock.call('outer'), mock.call('target'), mock.call('outer'),
+                          mock.call('target')])
+
+    def test_should_keep_recently_used_frames_only(self):
+        """Should keep the most recently used frame elements only."""
+        self.finder.FRAME_CACHE_SIZE = 2
+        self.finder._filter_elements.return_value = [self.web_element]
+        for frame in ('first', 'second', 'first', 'third'):
+            self.finder.find(self.driver, 'frame=id=%s |> id=target' % frame)
+        self.assertEqual(list(self.finder._frame_elements.keys()),
+                         [('session', 'id=first'), ('session', 'id=third')])
 
     def test_should_find_by_ng_binding(self):
         """Should find by exact binding name."""
@@ -95,9 +288,9 @@ class ExtendedElementFinderTests(unittest.TestCase):
                   binding_name
         tag = 'tag'
         self.finder._find_by_ng_binding(self.driver, binding_name, tag, constrains)
-        self.driver.execute_script.assert_called_with(script)
-        self.finder._filter_elements.assert_called_with(self.driver.execute_script.return_value,
-                                                        tag, constrains)
+        self.driver.execute_script.assert_called_with(script, None, {'constraints': constrains,
+                                                                     'first': False, 'tag': tag})
+        self.assertFalse(self.finder._filter_elements.called)
 
     def test_should_find_by_ng_binding_partial(self):
         """Should find by partial binding name."""
@@ -107,32 +300,194 @@ class ExtendedElementFinderTests(unittest.TestCase):
                  binding_name
         tag = 'tag'
         self.finder._find_by_ng_binding_partial(self.driver, binding_name, tag, constrains)
-        self.driver.execute_script.assert_called_with(script)
-        self.finder._filter_elements.assert_called_with(self.driver.execute_script.return_value,
-                                                        tag, constrains)
+        self.driver.execute_script.assert_called_with(script, None, {'constraints': constrains,
+                                                                     'first': False, 'tag': tag})
+        self.assertFalse(self.finder._filter_elements.called)
 
     def test_should_find_by_ng_model(self):
         """Should find by exact model name."""
-        constrains = 'constrains'
         model_name = 'a-model'
         stem = 'model="%s"' % model_name
         joiner = '%s],[' % stem
         criteria = '[' + joiner.join(self.ng_prefixes) + stem + ']'
-        tag = 'tag'
-        self.finder._find_by_ng_model(self.driver, model_name, tag, constrains)
+        self.finder._find_by_ng_model(self.driver, model_name, None, {})
+        self.assertFalse(self.driver.execute_script.called)
         self.finder._find_by_css_selector.assert_called_with(self.driver,
-                                                             criteria, tag,
-                                                             constrains)
+                                                             criteria, None,
+                                                             {})
+
+    def test_should_find_by_ng_model_with_ng_prefixes_in_use(self):
+        """Should find by exact model name with the ng prefixes used by the page."""
+        self.driver.execute_script.return_value = ['data-ng-']
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.driver.execute_script.assert_called_once_with(self.finder.NG_PREFIX_SCRIPT,
+                                                           self.ng_prefixes)
+        self.assertEqual(self.finder._find_by_css_selector.call_args_list,
+                         [mock.call(self.driver, '[data-ng-model="a-model"]', None,
+                                    {})] * 2)
+
+    def test_should_find_by_ng_model_with_all_ng_prefixes_on_miss(self):
+        """Should find by exact model name with all ng prefixes when nothing matches."""
+        self.driver.execute_script.return_value = ['data-ng-']
+        self.finder._find_by_css_selector.side_effect = [[], [self.web_element],
+                                                         [self.web_element]]
+        elements = self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.assertEqual(elements, [self.web_element])
+        selector = '[ng-model="a-model"],[data-ng-model="a-model"],[ng_model="a-model"],' \
+                   '[x-ng-model="a-model"],[ng\\:model="a-model"]'
+        self.finder._find_by_css_selector.assert_called_with(self.driver, selector, None, {})
+        # all ng prefixes are used for the rest of the document
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.driver.execute_script.assert_called_once_with(self.finder.NG_PREFIX_SCRIPT,
+                                                           self.ng_prefixes)
+        self.assertEqual(self.finder._find_by_css_selector.call_count, 3)
+        self.finder._find_by_css_selector.assert_called_with(self.driver, selector, None, {})
+
+    def test_should_find_all_by_ng_model_with_mixed_ng_prefixes(self):
+        """Should find all matches by exact model name with all ng prefixes, also when
+        the page has rendered other ng prefixes since they were detected."""
+        later_element = mock.Mock()
+        self.driver.execute_script.return_value = ['ng-']
+        self.finder._find_by_css_selector.side_effect = [[self.web_element],
+                                                         [self.web_element, later_element]]
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        elements = self.finder._find_by_ng_model(self.driver, 'a-model', None, {})
+        self.assertEqual(elements, [self.web_element, later_element])
+        selector = '[ng-model="a-model"],[data-ng-model="a-model"],[ng_model="a-model"],' \
+                   '[x-ng-model="a-model"],[ng\\:model="a-model"]'
+        self.finder._find_by_css_selector.assert_called_with(self.driver, selector, None, {})
+        self.driver.execute_script.assert_called_once_with(self.finder.NG_PREFIX_SCRIPT,
+                                                           self.ng_prefixes)
+
+    def test_should_detect_ng_prefixes_again_without_ng_prefixes_in_use(self):
+        """Should detect the ng prefixes used by the page again when none was detected."""
+        self.driver.execute_script.side_effect = [[], ['ng-']]
+        self.finder._find_by_css_selector.return_value = []
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.assertEqual(self.driver.execute_script.call_count, 2)
+
+    def test_should_detect_ng_prefixes_of_changed_document(self):
+        """Should detect the ng prefixes used by the page again when the document has
+        changed."""
+        self.driver.execute_script.return_value = ['ng-']
+        self.finder.set_document(self.driver, 'html')
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.finder.set_document(self.driver, 'html')
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.assertEqual(self.driver.execute_script.call_count, 1)
+        self.finder.set_document(self.driver, 'another html')
+        self.finder._find_by_ng_model(self.driver, 'a-model', None, {}, True)
+        self.assertEqual(self.driver.execute_script.call_count, 2)
+
+    def test_should_find_by_ng_model_with_tag_and_constraints(self):
+        """Should find by exact model name with the tag and constraints in the selector."""
+        self.driver.execute_script.return_value = ['ng-']
+        self.finder._find_by_ng_model(self.driver, 'a-model', 'input', {'name': 'agree'},
+                                      True)
+        self.finder._find_by_css_selector.assert_called_with(
+            self.driver, 'input[ng-model="a-model"][name="agree"]', None, {})
+
+    def test_should_find_by_ng_model_with_type_property(self):
+        """Should find by exact model name filtered by the type property."""
+        text_field = mock.Mock()
+        text_field.get_attribute.return_value = 'text'
+        checkbox = mock.Mock()
+        checkbox.get_attribute.return_value = 'checkbox'
+        self.driver.execute_script.return_value = ['ng-']
+        self.finder._find_by_css_selector.return_value = [text_field, checkbox]
+        elements = self.finder._find_by_ng_model(self.driver, 'a-model', 'input',
+                                                 {'type': 'text'}, True)
+        self.assertEqual(elements, [text_field])
+        self.finder._find_by_css_selector.assert_called_with(
+            self.driver, 'input[ng-model="a-model"]', None, {})
+        text_field.get_attribute.assert_called_once_with('type')
 
     def test_should_find_by_ng_options(self):
         """Should find by exact descriptor."""
-        constrains = 'constrains'
         descriptor = 'an-options'
         stem = 'options="%s"' % descriptor
         joiner = '%s] option,[' % stem
         criteria = '[' + joiner.join(self.ng_prefixes) + stem + '] option'
-        tag = 'tag'
-        self.finder._find_by_ng_options(self.driver, descriptor, tag, constrains)
+        self.driver.execute_script.return_value = []
+        self.finder._find_by_ng_options(self.driver, descriptor, None, {})
         self.finder._find_by_css_selector.assert_called_with(self.driver,
-                                                             criteria, tag,
-                                                             constrains)
+                                                             criteria, None,
+                                                             {})
+
+    def test_should_find_by_ng_options_with_ng_prefixes_in_use(self):
+        """Should find by exact descriptor with the ng prefixes used by the page."""
+        self.driver.execute_script.return_value = ['ng-', 'x-ng-']
+        self.finder._find_by_ng_options(self.driver, 'an-options', None, {}, True)
+        self.finder._find_by_css_selector.assert_called_with(
+            self.driver, '[ng-options="an-options"] option,[x-ng-options="an-options"] option',
+            None, {})
+
+    def test_should_not_find_by_ng_options_with_other_tag(self):
+        """Should not find any option when another tag is requested."""
+        self.assertEqual(self.finder._find_by_ng_options(self.driver, 'an-options', 'input', {}),
+                         [])
+        self.assertFalse(self.driver.execute_script.called)
+
+    def test_should_find_by_ng_repeater(self):
+        """Should find by partial repeater, row index and column binding name."""
+        constrains = 'constrains'
+        selector = '[ng-repeat],[data-ng-repeat],[ng_repeat],[x-ng-repeat],[ng\\:repeat]'
+        attributes = ['ng-repeat', 'data-ng-repeat', 'ng_repeat', 'x-ng-repeat', 'ng:repeat']
+        tag = 'tag'
+        self.finder._find_by_ng_repeater(self.driver, 'item in items |> 2 |> item.name',
+                                         tag, constrains)
+        self.driver.execute_script.assert_called_with(self.finder.NG_REPEATER_SCRIPT, None,
+                                                      {'constraints': constrains, 'first': False,
+                                                       'tag': tag},
+                                                      selector, attributes, 'item in items',
+                                                      False, 2, 'item.name')
+
+    def test_should_find_by_ng_repeater_column(self):
+        """Should find by partial repeater and column binding name of all rows."""
+        self.finder._find_by_ng_repeater(self.driver, 'item in items |> item.name', 'tag',
+                                         'constrains')
+        self.assertEqual(self.driver.execute_script.call_args[0][5:],
+                         ('item in items', False, None, 'item.name'))
+
+    def test_should_find_by_ng_repeater_exact(self):
+        """Should find by exact repeater."""
+        self.finder._find_by_ng_repeater_exact(self.driver, 'item in items', 'tag', 'constrains')
+        self.assertEqual(self.driver.execute_script.call_args[0][5:],
+                         ('item in items', True, None, None))
+
+    def test_should_find_by_shadow(self):
+        """Should find inside open shadow roots."""
+        constrains = 'constrains'
+        tag = 'tag'
+        self.finder._find_by_shadow(self.driver, 'my-app |> settings-panel |> button.save',
+                                    tag, constrains)
+        self.driver.execute_script.assert_called_with(self.finder.SHADOW_SCRIPT, None,
+                                                      {'constraints': constrains, 'first': False,
+                                                       'tag': tag},
+                                                      ['my-app', 'settings-panel', 'button.save'])
+
+    def test_should_not_record_statistics_by_default(self):
+        """Should not record any locator statistics by default."""
+        self.driver.execute_script.return_value = [self.web_element]
+        self.finder.find(self.driver, 'button=Save')
+        self.assertEqual(self.finder.get_statistics(), [])
+
+    @mock.patch('ExtendedSelenium2Library.locators.extendedelementfinder.time')
+    def test_should_record_statistics(self, mock_time):
+        """Should record the locator statistics ranked by their total lookup time."""
+        mock_time.side_effect = [0.0, 0.5, 1.0, 1.25, 2.0, 2.25]
+        self.finder.enable_statistics()
+        self.finder._filter_elements.return_value = [self.web_element]
+        self.driver.execute_script.side_effect = [[], [self.web_element], [self.web_element]]
+        self.finder.find(self.driver, 'button=Save')
+        self.finder.find(self.driver, 'button=Save')
+        self.finder.find(self.driver, 'css=#grid >> button=Close')
+        self.assertEqual(self.finder.get_statistics(),
+                         [{'locator': 'button=Save', 'lookups': 2, 'matches': 1,
+                           'max_time': 0.5, 'retries': 1, 'strategy': 'button', 'time': 0.75},
+                          {'locator': 'css=#grid >> button=Close', 'lookups': 1, 'matches': 1,
+                           'max_time': 0.25, 'retries': 0, 'strategy': 'button',
+                           'time': 0.25}])
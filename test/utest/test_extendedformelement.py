@@ -113,7 +113,7 @@ class ExtendedFormElementTests(unittest.TestCase):
         self.element._info.assert_called_with("Selecting checkbox '%s'." % self.locator)
         self.element._get_checkbox.assert_called_with(self.locator)
         self.web_element.is_selected.assert_called_with()
-        self.element._select_checkbox_or_radio_button.assert_called_with(self.locator)
+        self.element._select_checkbox_or_radio_button.assert_called_with(self.web_element)
 
     def test_should_ignore_selected_checkbox(self):
         """Should ignore selected checkbox."""
@@ -129,6 +129,73 @@ class ExtendedFormElementTests(unittest.TestCase):
         self.web_element.is_selected.assert_called_with()
         self.assertFalse(self.element._select_checkbox_or_radio_button.called)
 
+    def test_should_select_checkboxes(self):
+        """Should select checkboxes in one browser call."""
+        locators = (self.locator, 'css=table.permissions')
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = [self.web_element]
+        self.element._element_find = mock.Mock()
+        self.element._element_find.side_effect = [[self.web_element], [self.web_element]]
+        self.assertEqual(self.element.select_checkboxes(*locators), [self.web_element])
+        self.element._info.assert_called_with("Selecting checkboxes '%s', '%s'." % locators)
+        self.element._element_find.assert_any_call(self.locator, False, True)
+        self.element._element_find.assert_called_with('css=table.permissions', False, True)
+        self.element._current_browser().execute_script.\
+            assert_called_once_with(self.element.CHECK_INPUTS_SCRIPT,
+                                    [self.web_element, self.web_element], 'checkbox', True)
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+
+    def test_should_select_checkboxes_with_web_element(self):
+        """Should select checkboxes given as web elements without finding them."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = [self.web_element]
+        self.element._element_find = mock.Mock(return_value=[self.web_element])
+        self.element.select_checkboxes(self.web_element, self.locator)
+        self.element._element_find.assert_called_once_with(self.locator, False, True)
+        self.element._current_browser().execute_script.\
+            assert_called_once_with(self.element.CHECK_INPUTS_SCRIPT,
+                                    [self.web_element, self.web_element], 'checkbox', True)
+
+    def test_should_ignore_selected_checkboxes(self):
+        """Should ignore checkboxes that are already selected."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = []
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = [self.web_element]
+        self.assertEqual(self.element.select_checkboxes(self.locator), [])
+        self.assertFalse(self.element._wait_until_page_ready.called)
+
+    def test_should_select_radio_buttons(self):
+        """Should select radio buttons in one browser call."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = [self.web_element]
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = [self.web_element]
+        self.assertEqual(self.element.select_radio_buttons(self.locator), [self.web_element])
+        self.element._info.assert_called_with("Selecting radio buttons '%s'." % self.locator)
+        self.element._current_browser().execute_script.\
+            assert_called_once_with(self.element.CHECK_INPUTS_SCRIPT,
+                                    [self.web_element], 'radio', True)
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+
+    def test_should_unselect_checkboxes(self):
+        """Should unselect checkboxes in one browser call."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = [self.web_element]
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = [self.web_element]
+        self.assertEqual(self.element.unselect_checkboxes(self.locator), [self.web_element])
+        self.element._info.assert_called_with("Unselecting checkboxes '%s'." % self.locator)
+        self.element._current_browser().execute_script.\
+            assert_called_once_with(self.element.CHECK_INPUTS_SCRIPT,
+                                    [self.web_element], 'checkbox', False)
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+
     def test_should_select_radio_button(self):
         """Should select a radio button."""
         # pylint: disable=protected-access
@@ -142,8 +209,7 @@ class ExtendedFormElementTests(unittest.TestCase):
                                               (self.value, self.group_name))
         self.element._get_radio_button_with_value.assert_called_with(self.group_name, self.value)
         self.web_element.is_selected.assert_called_with()
-        self.element._select_checkbox_or_radio_button.\
-            assert_called_with('css=input[name="%s"][value="%s"]' % (self.group_name, self.value))
+        self.element._select_checkbox_or_radio_button.assert_called_with(self.web_element)
 
     def test_should_ignore_selected_radio_button(self):
         """Should ignore selected radio button."""
@@ -160,6 +226,29 @@ class ExtendedFormElementTests(unittest.TestCase):
         self.web_element.is_selected.assert_called_with()
         self.assertFalse(self.element._select_checkbox_or_radio_button.called)
 
+    def test_should_find_checkbox_once(self):
+        """Should find the checkbox once and reuse it for the selection."""
+        # pylint: disable=protected-access
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = self.web_element
+        self.web_element.is_selected = mock.Mock()
+        self.web_element.is_selected.return_value = False
+        self.element.select_checkbox(self.locator)
+        self.assertEqual(self.element._element_find.call_count, 1)
+        self.assertIs(self.element._wait_until_page_ready.call_args[0][0], self.web_element)
+
+    def test_should_find_radio_button_once(self):
+        """Should find the radio button once and reuse it for the selection."""
+        # pylint: disable=protected-access
+        self.element._debug = mock.Mock()
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = self.web_element
+        self.web_element.is_selected = mock.Mock()
+        self.web_element.is_selected.return_value = False
+        self.element.select_radio_button(self.group_name, self.value)
+        self.assertEqual(self.element._element_find.call_count, 1)
+        self.assertIs(self.element._wait_until_page_ready.call_args[0][0], self.web_element)
+
     def test_should_submit_form(self):
         """Should submit form."""
         # pylint: disable=protected-access
@@ -219,10 +308,105 @@ class ExtendedFormElementTests(unittest.TestCase):
         self.web_element.clear = mock.Mock()
         self.web_element.send_keys = mock.Mock()
         self.element._input_text_into_text_field(self.locator, self.value)
-        self.element._element_find(self.locator, True, True)
+        self.element._element_find.assert_called_once_with(self.locator, True, True)
         self.web_element.clear.assert_called_with()
         self.web_element.send_keys.assert_called_with(self.value)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
+
+    def test_should_get_form_snapshot(self):
+        """Should get form snapshot in one browser call."""
+        snapshot = {'email': {'value': 'me@example.com'}}
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = snapshot
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = self.web_element
+        self.assertEqual(self.element.get_form_snapshot(self.locator), snapshot)
+        self.element._element_find.assert_called_with(self.locator, True, True)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.FORM_SNAPSHOT_SCRIPT, self.web_element)
+
+    def test_should_get_form_snapshot_without_locator(self):
+        """Should get form snapshot of the first form without locator."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._element_find = mock.Mock()
+        self.element.get_form_snapshot()
+        self.element._element_find.assert_called_with('xpath=//form', True, True)
+
+    def test_should_match_form_snapshot(self):
+        """Should match form snapshot by value and by attributes."""
+        self.element.get_form_snapshot = mock.Mock()
+        self.element.get_form_snapshot.return_value = {
+            'email': {'type': 'text', 'value': 'me@example.com', 'valid': True},
+            'terms': {'type': 'checkbox', 'value': True, 'valid': True}
+        }
+        self.element.form_snapshot_should_match(self.locator, {
+            'email': 'me@example.com', 'terms': {'value': True, 'valid': True}})
+        self.element.get_form_snapshot.assert_called_with(self.locator)
+
+    def test_should_raise_form_snapshot_differences(self):
+        """Should raise all form snapshot differences."""
+        self.element.get_form_snapshot = mock.Mock()
+        self.element.get_form_snapshot.return_value = {
+            'email': {'type': 'text', 'value': 'me@example', 'valid': False}
+        }
+        with self.assertRaises(AssertionError) as context:
+            self.element.form_snapshot_should_match(self.locator, {
+                'email': {'value': 'me@example.com', 'valid': True}, 'terms': True})
+        self.assertEqual(str(context.exception),
+                         "Form '%s' did not match the expected snapshot:\n"
+                         "Field 'email' valid should have been 'True' but it was 'False'.\n"
+                         "Field 'email' value should have been 'me@example.com'"
+                         " but it was 'me@example'.\n"
+                         "Field 'terms' does not exist." % self.locator)
+
+    def test_should_raise_form_snapshot_message(self):
+        """Should raise form snapshot difference with custom message."""
+        self.element.get_form_snapshot = mock.Mock()
+        self.element.get_form_snapshot.return_value = {}
+        with self.assertRaises(AssertionError) as context:
+            self.element.form_snapshot_should_match(self.locator, {'terms': True}, 'message')
+        self.assertEqual(str(context.exception), 'message')
+
+    def test_should_input_text(self):
+        """Should input text into text field."""
+        # pylint: disable=protected-access
+        self.element._input_text_into_text_field = mock.Mock()
+        self.element.input_text(self.locator, self.value)
+        self.element._info.assert_called_with("Typing text '%s' into text field '%s'." %
+                                              (self.value, self.locator))
+        self.element._input_text_into_text_field.assert_called_with(self.locator, self.value,
+                                                                    False, False)
+
+    def test_should_set_text_field_value_directly(self):
+        """Should set text field value directly in one browser call."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = self.web_element
+        self.element._element_trigger_change = mock.Mock()
+        self.web_element.clear = mock.Mock()
+        self.web_element.send_keys = mock.Mock()
+        self.element._input_text_into_text_field(self.locator, self.value, direct_set=True)
+        self.element._element_find.assert_called_once_with(self.locator, True, True)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.SET_VALUE_SCRIPT, self.web_element, self.value)
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+        self.assertFalse(self.web_element.clear.called)
+        self.assertFalse(self.web_element.send_keys.called)
+        self.assertFalse(self.element._element_trigger_change.called)
+
+    def test_should_set_text_field_value_directly_and_skip_ready(self):
+        """Should set text field value directly with skip_ready."""
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._element_find = mock.Mock()
+        self.element._element_find.return_value = self.web_element
+        self.element._input_text_into_text_field(self.locator, self.value, True, True)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.SET_VALUE_SCRIPT, self.web_element, self.value)
+        self.assertFalse(self.element._wait_until_page_ready.called)
 
     def test_should_fill_text_field_and_skip_ready(self):
         """Should fill text field with skip_ready."""
@@ -242,9 +426,9 @@ class ExtendedFormElementTests(unittest.TestCase):
         """Should select checkbox or radio button."""
         # pylint: disable=protected-access
         self.element._wait_until_page_ready = mock.Mock()
-        self.element._select_checkbox_or_radio_button(self.locator)
+        self.element._select_checkbox_or_radio_button(self.web_element)
         self.element._wait_until_page_ready.\
-            assert_called_with(self.locator, skip_stale_check=True,
+            assert_called_with(self.web_element, skip_stale_check=True,
                                prefix='var cb=arguments[arguments.length-1];'
                                       'var el=arguments[0];if(window.angular){',
                                handler='function(){angular.element(el).'
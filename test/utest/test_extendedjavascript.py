@@ -26,6 +26,7 @@ path.append('src')
 import unittest
 import mock
 from ExtendedSelenium2Library.keywords import ExtendedJavascriptKeywords
+from selenium.common.exceptions import WebDriverException
 from Selenium2Library.keywords import _JavaScriptKeywords
 
 
@@ -39,8 +40,13 @@ class ExtendedJavascriptTests(unittest.TestCase):
         self.js_code_vars = 'return ${true}'
         self.script = ExtendedJavascriptKeywords()
         # pylint: disable=protected-access
+        self.script._builtin = mock.Mock()
+        self.script._builtin.replace_variables.side_effect = \
+            lambda text: {'${name}': "it's", '${size}': '5', '${flag}': True}.get(text, text)
         self.script._current_browser = mock.Mock()
         self.script._debug = mock.Mock()
+        self.script._inputs = {'browser_log_size': 1000}
+        self.script._is_internet_explorer = mock.Mock(return_value=False)
         self.script._warn = mock.Mock()
 
     def test_should_inherit_keywords(self):
@@ -50,35 +56,30 @@ class ExtendedJavascriptTests(unittest.TestCase):
     def test_execute_async_js_with_replaced_vars(self):
         """Should execute async js with replaced vars."""
         # pylint: disable=protected-access
-        self.script._get_javascript_to_execute = mock.Mock()
-        self.script._get_javascript_to_execute.return_value = self.js_code_vars
-        self.script._replace_variables_in_javascript_code = mock.Mock()
-        self.script._replace_variables_in_javascript_code.return_value = self.js_code
+        self.script._get_compiled_javascript = mock.Mock()
+        self.script._get_compiled_javascript.return_value = (self.js_code, ['value'])
         self.script._current_browser().execute_async_script = mock.Mock()
         self.script._current_browser().execute_async_script.return_value = True
         self.assertTrue(self.script.
                         execute_async_javascript_with_replaced_variables(self.js_code_vars))
-        self.script._get_javascript_to_execute.assert_called_with(self.js_code_vars)
-        self.script._replace_variables_in_javascript_code.assert_called_with(self.js_code_vars)
+        self.script._get_compiled_javascript.assert_called_with(self.js_code_vars)
         self.script._debug.assert_called_with('Executing Asynchronous JavaScript:\n%s' %
                                               self.js_code)
-        self.script._current_browser().execute_async_script.assert_called_with(self.js_code)
+        self.script._current_browser().execute_async_script.\
+            assert_called_with(self.js_code, 'value')
 
     def test_execute_js_with_replaced_vars(self):
         """Should execute js with replaced vars."""
         # pylint: disable=protected-access
-        self.script._get_javascript_to_execute = mock.Mock()
-        self.script._get_javascript_to_execute.return_value = self.js_code_vars
-        self.script._replace_variables_in_javascript_code = mock.Mock()
-        self.script._replace_variables_in_javascript_code.return_value = self.js_code
+        self.script._get_compiled_javascript = mock.Mock()
+        self.script._get_compiled_javascript.return_value = (self.js_code, ['value'])
         self.script._current_browser().execute_script = mock.Mock()
         self.script._current_browser().execute_script.return_value = True
         self.assertTrue(self.script.
                         execute_javascript_with_replaced_variables(self.js_code_vars))
-        self.script._get_javascript_to_execute.assert_called_with(self.js_code_vars)
-        self.script._replace_variables_in_javascript_code.assert_called_with(self.js_code_vars)
+        self.script._get_compiled_javascript.assert_called_with(self.js_code_vars)
         self.script._debug.assert_called_with('Executing JavaScript:\n%s' % self.js_code)
-        self.script._current_browser().execute_script.assert_called_with(self.js_code)
+        self.script._current_browser().execute_script.assert_called_with(self.js_code, 'value')
 
     def test_get_screen_size(self):
         """Should return the screen size."""
@@ -92,10 +93,10 @@ class ExtendedJavascriptTests(unittest.TestCase):
     def test_warn_any_js_errors(self):
         """Should render warn log message for any javascript errors."""
         logs = [{'message': 'Eeny'}, {'message': 'meeny'}, {'message': 'miny'}, {'message': 'moe'}]
-        self.script.get_browser_logs = mock.Mock()
-        self.script.get_browser_logs.return_value = logs
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.return_value = logs
         self.script.warn_any_javascript_errors()
-        self.script.get_browser_logs.assert_called_with()
+        self.script._current_browser().get_log.assert_called_with('browser')
         # pylint: disable=protected-access
         self.script._warn.assert_called_with(' %s' % logs)
 
@@ -103,10 +104,10 @@ class ExtendedJavascriptTests(unittest.TestCase):
         """Should render warn log message for any javascript errors with exclusion list."""
         logs = [{'message': 'Eeny'}, {'message': 'meeny'}, {'message': 'miny'}, {'message': 'moe'}]
         filtered_logs = [{'message': 'Eeny'}, {'message': 'meeny'}, {'message': 'moe'}]
-        self.script.get_browser_logs = mock.Mock()
-        self.script.get_browser_logs.return_value = logs
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.return_value = logs
         self.script.warn_any_javascript_errors(['miny'])
-        self.script.get_browser_logs.assert_called_with()
+        self.script._current_browser().get_log.assert_called_with('browser')
         # pylint: disable=protected-access
         self.script._warn.assert_called_with(' %s' % filtered_logs)
 
@@ -114,19 +115,190 @@ class ExtendedJavascriptTests(unittest.TestCase):
         """Should render warn log message for any javascript errors with label."""
         label = 'rhyme'
         logs = [{'message': 'Eeny'}, {'message': 'meeny'}, {'message': 'miny'}, {'message': 'moe'}]
-        self.script.get_browser_logs = mock.Mock()
-        self.script.get_browser_logs.return_value = logs
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.return_value = logs
         self.script.warn_any_javascript_errors(label=label)
-        self.script.get_browser_logs.assert_called_with()
+        self.script._current_browser().get_log.assert_called_with('browser')
         # pylint: disable=protected-access
         self.script._warn.assert_called_with('%s %s' % (label, logs))
 
-    def test_replace_variables_in_js_code(self):
-        """Should replace all variables in js code."""
+    def test_warn_any_js_errors_only_new_entries(self):
+        """Should render warn log message only for javascript errors since the last call."""
         # pylint: disable=protected-access
-        self.script._builtin = mock.Mock()
-        self.script._builtin.replace_variables = mock.Mock()
-        self.script._builtin.replace_variables.return_value = self.js_code_py
-        self.assertEqual(self.script.
-                         _replace_variables_in_javascript_code(self.js_code_vars), self.js_code)
-        self.script._builtin.replace_variables.assert_called_with(self.js_code_vars)
+        self.script._current_browser().get_log.side_effect = [
+            [{'message': 'Eeny'}], [], [{'message': 'meeny'}, {'message': 'miny.js'}]]
+        self.script.warn_any_javascript_errors()
+        self.script._warn.assert_called_with(" [{'message': 'Eeny'}]")
+        self.script._warn.reset_mock()
+        self.script.warn_any_javascript_errors()
+        self.assertFalse(self.script._warn.called)
+        self.script.warn_any_javascript_errors(['y.j'])
+        self.script._warn.assert_called_with(" [{'message': 'meeny'}]")
+
+    def test_collect_browser_logs_in_bounded_buffer(self):
+        """Should only keep the last javascript errors up to the buffer size."""
+        self.script._inputs['browser_log_size'] = 2
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.side_effect = [
+            [{'message': 'Eeny'}, {'message': 'meeny'}], [{'message': 'miny'}]]
+        self.script._collect_browser_logs()
+        collector = self.script._collect_browser_logs()
+        self.assertEqual(list(collector['entries']), [{'message': 'meeny'}, {'message': 'miny'}])
+        self.assertEqual(collector['total'], 3)
+
+    def test_keep_warned_browser_logs_in_buffer(self):
+        """Should keep the reported javascript errors in the buffer of all browser logs."""
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.side_effect = [
+            [{'message': 'Eeny'}], [{'message': 'meeny'}], []]
+        self.assertEqual(self.script._read_browser_logs('warned'), [{'message': 'Eeny'}])
+        collector = self.script._collect_browser_logs()
+        self.assertEqual(list(collector['entries']), [{'message': 'Eeny'}, {'message': 'meeny'}])
+        self.assertEqual(self.script._read_browser_logs('warned'), [{'message': 'meeny'}])
+
+    def test_excludes_matchers_cache_evicts_least_recent(self):
+        """Should evict least recently used excludes matchers."""
+        # pylint: disable=protected-access
+        self.script.EXCLUDES_CACHE_SIZE = 2
+        for excludes in (['a'], ['b'], ['a'], ['c']):
+            self.script._get_excludes_matcher(excludes)
+        self.assertEqual(list(self.script._excludes_matchers), [('a',), ('c',)])
+
+    def test_collect_browser_logs_on_iexplore(self):
+        """Should not collect javascript errors on Internet Explorer."""
+        # pylint: disable=protected-access
+        self.script._is_internet_explorer.return_value = True
+        self.assertEqual(list(self.script._collect_browser_logs()['entries']), [])
+        self.assertFalse(self.script._current_browser().get_log.called)
+
+    def test_collect_browser_logs_without_log_support(self):
+        """Should stop collecting javascript errors when the browser logs are not supported."""
+        # pylint: disable=protected-access
+        self.script._current_browser().get_log.side_effect = WebDriverException()
+        self.assertFalse(self.script._collect_browser_logs()['supported'])
+        self.script._collect_browser_logs()
+        self.assertEqual(self.script._current_browser().get_log.call_count, 1)
+
+    def test_compile_js_with_quoted_vars_as_arguments(self):
+        """Should pass whole string literal variables as script arguments."""
+        # pylint: disable=protected-access
+        self.assertEqual(self.script._get_compiled_javascript(
+            'return "${name}" === \'${name}\' && ${size} > 4 && ${flag}'),
+                         ('var __es2lArgs=arguments;return __es2lArgs[0] === __es2lArgs[1]'
+                          ' && 5 > 4 && true', ["it's", "it's"]))
+
+    def test_compile_js_with_embedded_and_escaped_vars(self):
+        """Should splice embedded variables and keep escaped variables."""
+        # pylint: disable=protected-access
+        self.assertEqual(self.script._get_compiled_javascript(
+            'return "a ${size}" + \'\\${name}\' // \'${name}\''),
+                         ('return "a 5" + \'\\${name}\' // \'it\'s\'', []))
+
+    def test_compile_js_once_per_source(self):
+        """Should only read and compile the same js code once."""
+        # pylint: disable=protected-access
+        self.script._get_javascript_to_execute = mock.Mock()
+        self.script._get_javascript_to_execute.return_value = 'return \'${name}\''
+        self.script._get_compiled_javascript(self.js_code_vars)
+        self.script._builtin.replace_variables.reset_mock()
+        self.assertEqual(self.script._get_compiled_javascript(self.js_code_vars),
+                         ('var __es2lArgs=arguments;return __es2lArgs[0]', ["it's"]))
+        self.script._get_javascript_to_execute.assert_called_once_with(self.js_code_vars)
+        self.script._builtin.replace_variables.assert_called_once_with('${name}')
+
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedjavascript.getmtime")
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedjavascript.isfile")
+    def test_compile_js_file_per_modification(self, mock_isfile, mock_getmtime):
+        """Should compile js file again when it is modified."""
+        js_file = '/path/to/file.js'
+        mock_isfile.return_value = True
+        mock_getmtime.side_effect = [1, 1, 2]
+        # pylint: disable=protected-access
+        self.script._get_javascript_to_execute = mock.Mock()
+        self.script._get_javascript_to_execute.return_value = self.js_code
+        for _ in range(3):
+            self.script._get_compiled_javascript(js_file)
+        self.assertEqual(self.script._get_javascript_to_execute.call_count, 2)
+
+    def test_compile_js_cache_evicts_least_recent(self):
+        """Should evict least recently used compiled js code."""
+        # pylint: disable=protected-access
+        self.script.JAVASCRIPT_CACHE_SIZE = 2
+        for code in ('return 1', 'return 2', 'return 1', 'return 3'):
+            self.script._get_compiled_javascript(code)
+        self.assertEqual(list(self.script._javascript_cache),
+                         [('return 1', None), ('return 3', None)])
+
+    def test_replace_python_values_in_js_code(self):
+        """Should replace standalone Python values in js code."""
+        # pylint: disable=protected-access
+        self.assertEqual(self.script._replace_python_values_in_javascript_code(
+            'return [True, False, None, a ? True : False, `${True}`]'),
+                         'return [true, false, null, a ? true : false, `${true}`]')
+
+    def test_keep_python_values_in_js_literals_and_names(self):
+        """Should keep Python values in js strings, comments, regexes and names."""
+        js_code = 'var isTrue = "True" + \'False\' + `None` + /True|False/.source;' \
+                  '// True\n/* None */ return {True: x.False, isTrueValue: 1 / 2}'
+        # pylint: disable=protected-access
+        self.assertEqual(self.script._replace_python_values_in_javascript_code(js_code),
+                         js_code)
+
+    def test_replace_python_values_in_spliced_js_code(self):
+        """Should replace Python values of spliced variables but not inside strings."""
+        # pylint: disable=protected-access
+        self.assertEqual(self.script._get_compiled_javascript(
+            'return "${size} True" === ${flag} + None'),
+                         ('return "5 True" === true + null', []))
+
+    def test_keep_python_values_of_vars_spliced_into_js_literals(self):
+        """Should keep Python values of variables spliced into js literals."""
+        # pylint: disable=protected-access
+        self.script._builtin.replace_variables.side_effect = \
+            lambda text: {'${status}': 'True story'}.get(text, text)
+        self.assertEqual(self.script._get_compiled_javascript("return 'Status: ${status}';"),
+                         ("return 'Status: True story';", []))
+        self.assertEqual(self.script._get_compiled_javascript(
+            'return `Status: ${status}` + ${status} /* ${status} */'),
+                         ('return `Status: True story` + true story /* True story */', []))
+
+    def test_execute_js_snippet(self):
+        """Should execute registered js snippet by name only."""
+        # pylint: disable=protected-access
+        self.script._current_browser().execute_script.return_value = 3
+        self.script.register_javascript_snippet('add', 'return arguments[0]', '+arguments[1]')
+        self.assertEqual(self.script.execute_javascript_snippet('add', 1, 2), 3)
+        revision = self.script._javascript_snippets_definition[0]
+        self.script._current_browser().execute_script.\
+            assert_called_once_with(self.script.SNIPPET_CALL_SCRIPT, revision, 'add', [1, 2])
+
+    def test_execute_js_snippet_defines_snippets(self):
+        """Should define all registered js snippets when the page does not have them."""
+        # pylint: disable=protected-access
+        self.script._current_browser().execute_script.side_effect = [{'__es2lMissing': True}, 3]
+        self.script.register_javascript_snippet('add', 'return arguments[0]+arguments[1]')
+        self.script.register_javascript_snippet('negate', 'return -arguments[0]')
+        self.assertEqual(self.script.execute_javascript_snippet('add', 1, 2), 3)
+        revision, definition = self.script._javascript_snippets_definition
+        self.assertIn('"add":function(){return arguments[0]+arguments[1]\n}', definition)
+        self.assertIn('"negate":function(){return -arguments[0]\n}', definition)
+        self.script._current_browser().execute_script.\
+            assert_called_with(definition, revision, 'add', [1, 2])
+
+    def test_register_js_snippet_changes_revision(self):
+        """Should change the js snippets revision when the registered snippets change."""
+        # pylint: disable=protected-access
+        self.script.register_javascript_snippet('add', 'return arguments[0]+arguments[1]')
+        self.script.execute_javascript_snippet('add', 1, 2)
+        revision = self.script._javascript_snippets_definition[0]
+        self.script.register_javascript_snippet('negate', 'return -arguments[0]')
+        self.script.execute_javascript_snippet('add', 1, 2)
+        self.assertNotEqual(self.script._javascript_snippets_definition[0], revision)
+        self.script.remove_javascript_snippet('negate')
+        self.script.execute_javascript_snippet('add', 1, 2)
+        self.assertEqual(self.script._javascript_snippets_definition[0], revision)
+
+    def test_execute_unregistered_js_snippet(self):
+        """Should raise an error for unregistered js snippet."""
+        with self.assertRaises(ValueError):
+            self.script.execute_javascript_snippet('add', 1, 2)
@@ -26,6 +26,8 @@ path.append('src')
 import unittest
 import mock
 from ExtendedSelenium2Library.keywords import ExtendedSelectElementKeywords
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.webelement import WebElement
 from Selenium2Library.keywords import _SelectElementKeywords
 
 
@@ -34,74 +36,200 @@ class ExtendedSelectElementTests(unittest.TestCase):
 
     def setUp(self):
         """Instantiate the extended select element class."""
+        self.driver = mock.Mock()
+        self.driver.session_id = 'session'
         self.element = ExtendedSelectElementKeywords()
+        self.web_element = WebElement(self.driver, 'element', False)
+        # pylint: disable=protected-access
+        self.element._current_browser = mock.Mock()
+        self.element._current_browser().execute_script.return_value = []
+        self.element._element_find = mock.Mock(return_value=self.web_element)
+        self.element._element_trigger_change = mock.Mock()
+        self.element._info = mock.Mock()
+        self.element._wait_until_page_ready = mock.Mock()
         self.indexes = (1, 2, 3, 4, 5)
         self.items = ('1', '2', '3', '4', '5')
         self.labels = ('1', '2', '3', '4', '5')
         self.locator = 'css=.selector'
+        self.snapshot = {'labels': ['One'], 'selected': [True], 'values': ['1']}
         self.values = ('1', '2', '3', '4', '5')
 
     def test_should_inherit_keywords(self):
         """Extended select element instance should inherit Selenium2 select element instances."""
         self.assertIsInstance(self.element, _SelectElementKeywords)
 
+    def test_should_get_list_items(self):
+        """Should return all option labels from list in one browser call."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = self.snapshot
+        self.assertEqual(self.element.get_list_items(self.locator), self.snapshot['labels'])
+        self.element._element_find.assert_called_with(self.locator, True, True, 'select')
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.LIST_SNAPSHOT_SCRIPT, self.web_element, None, False)
+
+    def test_should_get_list_snapshot(self):
+        """Should return filtered option snapshot from list in one browser call."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = self.snapshot
+        self.assertEqual(self.element.get_list_snapshot(self.locator, 'One', True), self.snapshot)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.LIST_SNAPSHOT_SCRIPT, self.web_element, 'One', True)
+
+    def test_should_get_selected_list_labels(self):
+        """Should return selected option labels from list."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = self.snapshot
+        self.assertEqual(self.element.get_selected_list_labels(self.locator),
+                         self.snapshot['labels'])
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.LIST_SNAPSHOT_SCRIPT, self.web_element, None, True)
+
+    def test_should_get_selected_list_values(self):
+        """Should return selected option values from list."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = self.snapshot
+        self.assertEqual(self.element.get_selected_list_values(self.locator),
+                         self.snapshot['values'])
+
+    def test_should_raise_exception_without_selected_list_values(self):
+        """Should raise exception when list does not have any selected options."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = \
+            {'labels': [], 'selected': [], 'values': []}
+        with self.assertRaises(ValueError):
+            self.element.get_selected_list_labels(self.locator)
+
     @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
                 "_SelectElementKeywords.select_all_from_list")
     def test_should_select_all_from_list(self, mock_select_all_from_list):
         """Should select all option items from list."""
         # pylint: disable=protected-access
-        self.element._element_trigger_change = mock.Mock()
+        self.element._current_browser().execute_script.return_value = None
         self.element.select_all_from_list(self.locator)
+        self.element._element_find.assert_called_with(self.locator, True, True, 'select')
         mock_select_all_from_list.assert_called_with(self.locator)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
+
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
+                "_SelectElementKeywords.select_all_from_list")
+    def test_should_select_all_from_multi_select_list(self, mock_select_all_from_list):
+        """Should select all option items from multi-select list in one browser call."""
+        # pylint: disable=protected-access
+        self.element.select_all_from_list(self.locator)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.SELECT_OPTIONS_SCRIPT, self.web_element, 'item', [])
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+        self.assertFalse(mock_select_all_from_list.called)
+        self.assertFalse(self.element._element_trigger_change.called)
 
     @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
                 "_SelectElementKeywords.select_from_list")
     def test_should_select_from_list(self, mock_select_from_list):
         """Should select option items from list by item."""
         # pylint: disable=protected-access
-        self.element._element_trigger_change = mock.Mock()
-        self.element.select_from_list(self.locator, self.items)
-        mock_select_from_list.assert_called_with(self.locator, self.items)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._current_browser().execute_script.return_value = None
+        self.element.select_from_list(self.locator, *self.items)
+        mock_select_from_list.assert_called_with(self.locator, *self.items)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
+
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
+                "_SelectElementKeywords.select_from_list")
+    def test_should_select_from_multi_select_list(self, mock_select_from_list):
+        """Should select option items from multi-select list by item in one browser call."""
+        # pylint: disable=protected-access
+        self.element.select_from_list(self.locator, *self.items)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.SELECT_OPTIONS_SCRIPT, self.web_element, 'item',
+                               list(self.items))
+        self.element._wait_until_page_ready.assert_called_with(skip_stale_check=True)
+        self.assertFalse(mock_select_from_list.called)
+
+    def test_should_raise_missing_items_from_multi_select_list(self):
+        """Should raise exception when multi-select list does not have the items."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = ['4', '5']
+        with self.assertRaises(ValueError) as context:
+            self.element.select_from_list(self.locator, *self.items)
+        self.assertEqual(' '.join(context.exception.args),
+                         "Options '4, 5' not in list '%s'." % self.locator)
+        self.assertFalse(self.element._wait_until_page_ready.called)
 
     @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
                 "_SelectElementKeywords.select_from_list_by_index")
     def test_should_select_from_list_by_index(self, mock_select_from_list_by_index):
         """Should select option items from list by index."""
         # pylint: disable=protected-access
-        self.element._element_trigger_change = mock.Mock()
-        self.element.select_from_list_by_index(self.locator, self.indexes)
-        mock_select_from_list_by_index.assert_called_with(self.locator, self.indexes)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._current_browser().execute_script.return_value = None
+        self.element.select_from_list_by_index(self.locator, *self.indexes)
+        mock_select_from_list_by_index.assert_called_with(self.locator, *self.indexes)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
+
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
+                "_SelectElementKeywords.select_from_list_by_index")
+    def test_should_select_from_multi_select_list_by_index(self, mock_select_from_list_by_index):
+        """Should select option items from multi-select list by index in one browser call."""
+        # pylint: disable=protected-access
+        self.element.select_from_list_by_index(self.locator, *self.items)
+        self.element._current_browser().execute_script.\
+            assert_called_with(self.element.SELECT_OPTIONS_SCRIPT, self.web_element, 'index',
+                               list(self.indexes))
+        self.assertFalse(mock_select_from_list_by_index.called)
 
     @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
                 "_SelectElementKeywords.select_from_list_by_label")
     def test_should_select_from_list_by_label(self, mock_select_from_list_by_label):
         """Should select option items from list by label."""
         # pylint: disable=protected-access
-        self.element._element_trigger_change = mock.Mock()
-        self.element.select_from_list_by_label(self.locator, self.labels)
-        mock_select_from_list_by_label.assert_called_with(self.locator, self.labels)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._current_browser().execute_script.return_value = None
+        self.element.select_from_list_by_label(self.locator, *self.labels)
+        mock_select_from_list_by_label.assert_called_with(self.locator, *self.labels)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
 
     @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
                 "_SelectElementKeywords.select_from_list_by_value")
     def test_should_select_from_list_by_value(self, mock_select_from_list_by_value):
         """Should select option items from list by value."""
         # pylint: disable=protected-access
-        self.element._element_trigger_change = mock.Mock()
-        self.element.select_from_list_by_value(self.locator, self.values)
-        mock_select_from_list_by_value.assert_called_with(self.locator, self.values)
-        self.element._element_trigger_change.assert_called_with(self.locator)
+        self.element._current_browser().execute_script.return_value = None
+        self.element.select_from_list_by_value(self.locator, *self.values)
+        mock_select_from_list_by_value.assert_called_with(self.locator, *self.values)
+        self.element._element_trigger_change.assert_called_with(self.web_element)
+
+    def test_should_raise_missing_value_from_multi_select_list(self):
+        """Should raise exception when multi-select list does not have the value."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = ['5']
+        with self.assertRaises(NoSuchElementException):
+            self.element.select_from_list_by_value(self.locator, *self.values)
+
+    @mock.patch("ExtendedSelenium2Library.keywords.extendedselectelement."
+                "_SelectElementKeywords.select_from_list_by_label")
+    def test_should_fall_back_with_locator(self, mock_select_from_list_by_label):
+        """Should pass the locator to the fallback, which logs it, and reuse the found
+        select list for the change event."""
+        # pylint: disable=protected-access
+        self.element._current_browser().execute_script.return_value = None
+        self.element.select_from_list_by_label(self.locator, *self.labels)
+        mock_select_from_list_by_label.assert_called_with(self.locator, *self.labels)
+        self.element._element_trigger_change.assert_called_once_with(self.web_element)
+
+    def test_should_log_selected_items_from_multi_select_list(self):
+        """Should log the selected items of a multi-select list."""
+        # pylint: disable=protected-access
+        self.element.select_from_list_by_index(self.locator, *self.indexes)
+        self.element._info.assert_called_with("Selecting index(es) '1, 2, 3, 4, 5' from list "
+                                              "'%s'." % self.locator)
+        self.element.select_all_from_list(self.locator)
+        self.element._info.assert_called_with("Selecting all options from list '%s'." %
+                                              self.locator)
 
     def test_should_trigger_change(self):
         """Should trigger change event."""
         # pylint: disable=protected-access
-        self.element._wait_until_page_ready = mock.Mock()
-        self.element._element_trigger_change(self.locator)
+        del self.element._element_trigger_change
+        self.element._element_trigger_change(self.web_element)
         self.element._wait_until_page_ready.\
-            assert_called_with(self.locator, skip_stale_check=True,
+            assert_called_with(self.web_element, skip_stale_check=True,
                                prefix='var cb=arguments[arguments.length-1];'
                                       'var el=arguments[0];if(window.angular){',
                                handler='function(){$(el).trigger(\'change\').'
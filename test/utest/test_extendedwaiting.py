@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from sys import path
+path.append('src')
+import unittest
+import mock
+from ExtendedSelenium2Library.keywords import ExtendedWaitingKeywords
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, \
+    WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+from Selenium2Library.keywords import _WaitingKeywords
+
+
+class ExtendedWaitingTests(unittest.TestCase):
+    """Extended waiting keyword test class."""
+
+    def setUp(self):
+        """Instantiate the extended waiting class."""
+        self.script = 'var cb=arguments[arguments.length-1];cb(true)'
+        self.state = ['id', 1, 'http://localhost']
+        self.waiting = ExtendedWaitingKeywords()
+        # pylint: disable=protected-access
+        self.waiting._builtin = mock.Mock()
+        self.waiting._current_browser = mock.Mock()
+        self.waiting._debug = mock.Mock()
+        self.waiting._format_timeout = mock.Mock(return_value='0 seconds')
+        self.waiting._info = mock.Mock()
+        self.waiting._inputs = {
+            'block_until_page_ready': True,
+            'browser_breath_delay': 0.05,
+            'browser_log_size': 1000,
+            'capture_javascript_errors': False,
+            'ensure_jq': False,
+            'poll_frequency': 0.2,
+        }
+        self.waiting._implicit_wait_in_secs = 15.0
+        self.waiting._page_ready_conditions = {}
+        self.waiting._page_ready_keyword_list = []
+        self.waiting._page_ready_state = None
+        self.waiting._parse_attribute_locator = mock.Mock(
+            side_effect=lambda attribute_locator: tuple(attribute_locator.rsplit('@', 1)))
+        self.waiting._timeout_in_secs = 5.0
+        self.waiting._wait_until_script_ready = mock.Mock()
+        self.web_element = WebElement(mock.Mock(), 'element', False)
+        self.waiting.NG_WRAPPER = '%(prefix)s%(handler)s%(suffix)s'
+
+    def test_should_inherit_keywords(self):
+        """Extended waiting instance should inherit Selenium2 waiting instances."""
+        self.assertIsInstance(self.waiting, _WaitingKeywords)
+
+    def test_should_not_probe_without_page_ready_keywords(self):
+        """Should run the plain page ready script without page ready keywords."""
+        # pylint: disable=protected-access
+        self.waiting._wait_until_script_ready.return_value = True
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertTrue(responses['response'])
+        self.assertEqual(responses['page_ready_keywords'], [])
+        script = self.waiting._wait_until_script_ready.call_args[0][2]
+        self.assertFalse('window.__es2l' in script)
+        self.assertFalse(self.waiting._builtin.run_keyword.called)
+
+    def test_should_set_document_of_stale_check(self):
+        """Should set the document of the stale check."""
+        browser = mock.Mock()
+        browser.find_element_by_tag_name.return_value = self.web_element
+        # pylint: disable=protected-access
+        self.waiting._inputs['browser_breath_delay'] = 0
+        self.waiting._set_document = mock.Mock()
+        self.waiting._wait_until_html_ready(browser, 0.1)
+        browser.find_element_by_tag_name.assert_called_once_with('html')
+        self.waiting._set_document.assert_called_once_with(browser, 'element')
+
+    def test_should_capture_javascript_errors_with_page_ready(self):
+        """Should capture javascript errors in the same call as the page ready script."""
+        errors = [{'level': 'SEVERE', 'message': 'boom', 'source': 'javascript'}]
+        self.waiting._inputs['capture_javascript_errors'] = True
+        # pylint: disable=protected-access
+        self.waiting._store_browser_logs = mock.Mock()
+        self.waiting._wait_until_script_ready.return_value = {'__es2lErrors': errors,
+                                                              'response': True}
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertTrue(responses['response'])
+        self.waiting._store_browser_logs.assert_called_once_with(errors)
+        self.assertEqual(self.waiting._wait_until_script_ready.call_count, 1)
+        script = self.waiting._wait_until_script_ready.call_args[0][2]
+        self.assertTrue('ns.errors' in script)
+
+    def test_should_capture_javascript_errors_without_browser_logs(self):
+        """Should only capture javascript errors by default when browser logs are missing."""
+        self.waiting._inputs['capture_javascript_errors'] = None
+        # pylint: disable=protected-access
+        self.waiting._get_browser_log_collector = mock.Mock(return_value={'supported': True})
+        self.waiting._is_internet_explorer = mock.Mock(return_value=False)
+        self.assertFalse(self.waiting._is_capturing_javascript_errors())
+        self.waiting._is_internet_explorer.return_value = True
+        self.assertTrue(self.waiting._is_capturing_javascript_errors())
+        self.waiting._is_internet_explorer.return_value = False
+        self.waiting._get_browser_log_collector.return_value = {'supported': False}
+        self.assertTrue(self.waiting._is_capturing_javascript_errors())
+
+    def test_should_run_page_ready_keywords_on_change(self):
+        """Should run page ready keywords when the page has changed."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_keyword_list = ['My Keyword']
+        self.waiting._wait_until_script_ready.return_value = {
+            'changed': True, 'response': True, 'state': self.state, 'timings': {}}
+        self.waiting._builtin.run_keyword.return_value = 'result'
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertTrue(responses['response'])
+        self.assertEqual(responses['page_ready_keywords'], ['result'])
+        self.assertTrue('My Keyword' in responses['page_ready_timings'])
+        self.assertEqual(self.waiting._page_ready_state, self.state)
+        self.waiting._builtin.run_keyword.assert_called_with('My Keyword')
+        script = self.waiting._wait_until_script_ready.call_args[0][2]
+        self.assertTrue('window.__es2l' in script)
+
+    def test_should_skip_page_ready_keywords_without_change(self):
+        """Should not run page ready keywords when the page has not changed."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_keyword_list = ['My Keyword']
+        self.waiting._page_ready_state = self.state
+        self.waiting._wait_until_script_ready.return_value = {
+            'changed': False, 'response': True, 'state': self.state, 'timings': {}}
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertTrue(responses['response'])
+        self.assertEqual(responses['page_ready_keywords'], [])
+        self.assertFalse(self.waiting._builtin.run_keyword.called)
+        script = self.waiting._wait_until_script_ready.call_args[0][2]
+        self.assertTrue('"id", 1, "http://localhost"' in script)
+
+    def test_should_check_page_ready_conditions_in_browser(self):
+        """Should check page ready conditions in the browser instead of running keywords."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_conditions = {'Spinner Is Gone': '!window.spinner'}
+        self.waiting._page_ready_keyword_list = ['Spinner Is Gone']
+        self.waiting._wait_until_script_ready.return_value = {
+            'changed': True, 'response': True, 'state': self.state,
+            'timings': {'Spinner Is Gone': 1500}}
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertEqual(responses['page_ready_timings'], {'Spinner Is Gone': 1.5})
+        self.assertFalse(self.waiting._builtin.run_keyword.called)
+        script = self.waiting._wait_until_script_ready.call_args[0][2]
+        self.assertTrue('"Spinner Is Gone":function(){return (!window.spinner)}' in script)
+
+    def test_should_run_page_ready_keyword_when_condition_is_not_met(self):
+        """Should run the page ready keyword when its condition was not met in the browser."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_conditions = {'Spinner Is Gone': '!window.spinner'}
+        self.waiting._page_ready_keyword_list = ['Spinner Is Gone']
+        self.waiting._wait_until_script_ready.return_value = {
+            'changed': True, 'response': True, 'state': self.state, 'timings': {}}
+        self.waiting._builtin.run_keyword.side_effect = AssertionError('Spinner is visible')
+        with self.assertRaises(AssertionError):
+            self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.waiting._builtin.run_keyword.assert_called_with('Spinner Is Gone')
+
+    def test_should_check_page_ready_conditions_for_a_single_poll(self):
+        """Should give up on unmet page ready conditions after a single poll."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_conditions = {'My Keyword': 'window.ready'}
+        script = self.waiting._get_page_ready_probe_script('cb(true)', 15.0)
+        self.assertTrue('e=new Date().getTime()+200;' in script)
+        self.assertFalse('characterData' in script)
+
+    def test_should_run_page_ready_keywords_on_probe_timeout(self):
+        """Should run page ready keywords when the probe did not come back."""
+        # pylint: disable=protected-access
+        self.waiting._page_ready_keyword_list = ['My Keyword']
+        self.waiting._page_ready_state = self.state
+        self.waiting._wait_until_script_ready.return_value = None
+        responses = self.waiting._wait_until_page_ready(skip_stale_check=True)
+        self.assertIsNone(responses['response'])
+        self.assertIsNone(self.waiting._page_ready_state)
+        self.waiting._builtin.run_keyword.assert_called_with('My Keyword')
+
+    def test_wait_for_condition_with_replaced_variables(self):
+        """Should replace variables once and only execute the condition on each poll."""
+        js_code = 'var __es2lArgs=arguments;return __es2lArgs[0]===\'done\''
+        # pylint: disable=protected-access
+        self.waiting._get_compiled_javascript = mock.Mock(return_value=(js_code, ['done']))
+        self.waiting._current_browser().execute_script.side_effect = [False, False, True]
+        self.waiting._inputs['poll_frequency'] = 0.01
+        self.waiting.wait_for_condition_with_replaced_variables("return '${state}'==='done'")
+        self.waiting._get_compiled_javascript.\
+            assert_called_once_with("return '${state}'==='done'")
+        self.waiting._current_browser().execute_script.assert_called_with(js_code, 'done')
+        self.assertEqual(self.waiting._current_browser().execute_script.call_count, 3)
+
+    def test_wait_until_location_contains(self):
+        """Should watch location changes in the browser until it contains expected."""
+        # pylint: disable=protected-access
+        self.waiting._wait_until_script_ready.return_value = 'http://localhost/#/expected'
+        self.waiting.wait_until_location_contains('expected', 5)
+        self.assertEqual(self.waiting._wait_until_script_ready.call_count, 1)
+        args = self.waiting._wait_until_script_ready.call_args[0]
+        self.assertEqual(args[2], self.waiting.LOCATION_WATCHER)
+        self.assertEqual(args[3:5], ('expected', False))
+
+    def test_wait_until_location_does_not_contain(self):
+        """Should watch location changes in the browser until it does not contain unexpected."""
+        # pylint: disable=protected-access
+        self.waiting._wait_until_script_ready.return_value = 'http://localhost/#/expected'
+        self.waiting.wait_until_location_does_not_contain('unexpected', 5)
+        args = self.waiting._wait_until_script_ready.call_args[0]
+        self.assertEqual(args[3:5], ('unexpected', True))
+
+    def test_should_only_remove_subscribed_location_listener(self):
+        """Should only remove the location listener which is still subscribed."""
+        self.assertTrue('var i=l.indexOf(d);' in self.waiting.LOCATION_WATCHER)
+        self.assertTrue('if(i>-1){l.splice(i,1)}' in self.waiting.LOCATION_WATCHER)
+
+    def test_wait_until_location_contains_after_unload(self):
+        """Should watch the new document when the current one is unloaded."""
+        # pylint: disable=protected-access
+        self.waiting._inputs['poll_frequency'] = 0
+        self.waiting._wait_until_script_ready.side_effect = \
+            [WebDriverException('unloaded'), 'http://localhost/#/expected']
+        self.waiting.wait_until_location_contains('expected', 5)
+        self.assertEqual(self.waiting._wait_until_script_ready.call_count, 2)
+
+    def test_wait_until_location_contains_should_raise_script_errors(self):
+        """Should raise errors which are not caused by a navigation right away."""
+        # pylint: disable=protected-access
+        self.waiting._wait_until_script_ready.side_effect = \
+            WebDriverException('javascript error: x is not defined')
+        with self.assertRaises(WebDriverException):
+            self.waiting.wait_until_location_contains('expected', 5)
+        self.assertEqual(self.waiting._wait_until_script_ready.call_count, 1)
+
+    def test_wait_until_location_contains_should_time_out(self):
+        """Should raise timeout exception when location does not contain expected in time."""
+        # pylint: disable=protected-access
+        self.waiting._wait_until_script_ready.return_value = None
+        with self.assertRaises(TimeoutException) as context:
+            self.waiting.wait_until_location_contains('expected', 0)
+        self.assertTrue("Location did not contain 'expected'" in context.exception.msg)
+
+    def test_wait_until_element_contains_attribute(self):
+        """Should resolve the element once and watch its attribute in the browser."""
+        # pylint: disable=protected-access
+        self.waiting._element_find = mock.Mock(return_value=self.web_element)
+        self.waiting._wait_until_script_ready.return_value = []
+        self.waiting.wait_until_element_contains_attribute('css=.selector@class', 'active', 5)
+        self.waiting._element_find.assert_called_once_with('css=.selector', True, True)
+        args = self.waiting._wait_until_script_ready.call_args[0]
+        self.assertEqual(args[2], self.waiting.ATTRIBUTE_WATCHER)
+        self.assertEqual(args[3], [[self.web_element, 'class', 'active', False]])
+
+    def test_wait_until_element_does_not_contain_attribute(self):
+        """Should watch the element attribute until it does not contain unexpected."""
+        # pylint: disable=protected-access
+        self.waiting._element_find = mock.Mock(return_value=self.web_element)
+        self.waiting._wait_until_script_ready.return_value = []
+        self.waiting.wait_until_element_does_not_contain_attribute('css=.selector@class',
+                                                                   'active', 5)
+        args = self.waiting._wait_until_script_ready.call_args[0]
+        self.assertEqual(args[3], [[self.web_element, 'class', 'active', True]])
+
+    def test_wait_until_elements_contain_attributes(self):
+        """Should watch several element attributes in one browser call."""
+        # pylint: disable=protected-access
+        self.waiting._element_find = mock.Mock(return_value=self.web_element)
+        self.waiting._wait_until_script_ready.return_value = []
+        self.waiting.wait_until_elements_contain_attributes({'css=.a@class': 'active',
+                                                             'css=.b@title': 'done'}, 5)
+        self.assertEqual(self.waiting._element_find.call_count, 2)
+        self.assertEqual(self.waiting._wait_until_script_ready.call_count, 1)
+        pairs = self.waiting._wait_until_script_ready.call_args[0][3]
+        self.assertEqual(sorted(pair[1:] for pair in pairs),
+                         [['class', 'active', False], ['title', 'done', False]])
+
+    def test_wait_until_element_contains_attribute_after_stale(self):
+        """Should resolve the element again when it went stale while watching."""
+        # pylint: disable=protected-access
+        self.waiting._element_find = mock.Mock(return_value=self.web_element)
+        self.waiting._wait_until_script_ready.side_effect = \
+            [StaleElementReferenceException('stale'), []]
+        self.waiting.wait_until_element_contains_attribute('css=.selector@class', 'active', 5)
+        self.assertEqual(self.waiting._element_find.call_count, 2)
+
+    def test_wait_until_element_contains_attribute_should_time_out(self):
+        """Should raise timeout exception when the attribute does not match in time."""
+        # pylint: disable=protected-access
+        self.waiting._element_find = mock.Mock(return_value=self.web_element)
+        self.waiting._wait_until_script_ready.return_value = [0]
+        with self.assertRaises(TimeoutException) as context:
+            self.waiting.wait_until_element_contains_attribute('css=.selector@class',
+                                                               'active', 0)
+        self.assertTrue("Element did not contain attribute 'active'" in context.exception.msg)
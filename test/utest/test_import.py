@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Extended Selenium2 Library - a web testing library with AngularJS support.
+#    Copyright (c) 2015, 2016 Richard Huang <rickypc@users.noreply.github.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU Affero General Public License as
+#    published by the Free Software Foundation, either version 3 of the
+#    License, or (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU Affero General Public License for more details.
+#
+#    You should have received a copy of the GNU Affero General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Extended Selenium2 Library - a web testing library with AngularJS support.
+"""
+
+from os.path import abspath
+from subprocess import check_output
+from sys import executable
+import unittest
+
+
+class ImportTests(unittest.TestCase):
+    """Library import test class."""
+
+    # the dependencies which must be fully loaded by Selenium2Library already
+    DEPENDENCIES = ('robot', 'selenium', 'Selenium2Library')
+    IMPORT_SCRIPT = 'import sys;sys.path.insert(0,%r);import Selenium2Library;' \
+                    'before=set(sys.modules);import ExtendedSelenium2Library;' \
+                    'print(",".join(sorted(set(sys.modules)-before)))'
+
+    def test_should_not_import_more_dependency_modules(self):
+        """Should not import any dependency module on top of the ones Selenium2Library
+        imports, the import time is measured by the benchmark."""
+        # a fresh interpreter, the library is already imported in this one
+        modules = check_output([executable, '-c', self.IMPORT_SCRIPT % abspath('src')])
+        modules = [module for module in modules.decode('utf-8').strip().split(',')
+                   if module.split('.')[0] in self.DEPENDENCIES]
+        self.assertEqual(modules, [],
+                         'Importing the library imported more dependency modules: %s' %
+                         ', '.join(modules))